@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from .models import Member
 from .schemas import MemberCreate
-from .rl.trainer import generate_group_rl
+from .rl import trainer
 
 def create_member(db: Session, member: MemberCreate):
     db_member = Member(
@@ -17,15 +17,8 @@ def get_all_members(db: Session):
     return db.query(Member).all()
 
 def generate_group_rl_from_db(db: Session):
-    members = db.query(Member).all()
-
-    member_dicts = [
-        {"id": m.id, "name": m.name, "category": m.category}
-        for m in members
-    ]
-
-    group, reward = generate_group_rl(member_dicts)
-    return group, reward
+    # Reads ids / categories only; see trainer._load_roster
+    return trainer.generate_group_rl_from_db(db)
 
 def create_members_bulk(db: Session, members: list[MemberCreate]):
     db_members = [
@@ -1,8 +1,12 @@
 import os
+from contextlib import asynccontextmanager
+from typing import Union
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 load_dotenv()
 
@@ -17,7 +21,124 @@ DATABASE_URL = os.getenv(
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(DATABASE_URL)
+
+# ── Tuning ─────────────────────────────────────────────────────────────────
+#
+# Per-dialect engine settings, overridable through env vars:
+#
+#   Postgres   DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+#              DB_POOL_RECYCLE (seconds), DB_POOL_PRE_PING (true/false)
+#   SQLite     SQLITE_JOURNAL_MODE (WAL), SQLITE_SYNCHRONOUS (NORMAL),
+#              SQLITE_MMAP_SIZE (bytes), SQLITE_BUSY_TIMEOUT_MS
+#
+# WAL lets readers keep going while a writer commits, and busy_timeout
+# makes a blocked writer wait instead of failing with "database is locked".
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+if IS_SQLITE:
+    SQLITE_PRAGMAS = {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 2**20),
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+    }
+    ENGINE_OPTIONS = {
+        # Sessions are handed between threadpool workers and job threads
+        "connect_args": {"check_same_thread": False},
+    }
+else:
+    SQLITE_PRAGMAS = {}
+    ENGINE_OPTIONS = {
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+engine = create_engine(DATABASE_URL, **ENGINE_OPTIONS)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+
+
+# ── Async option ───────────────────────────────────────────────────────────
+#
+# DB_ASYNC=true serves the member / assessment routes from an async engine
+# (aiosqlite for SQLite, asyncpg for Postgres; ASYNC_DATABASE_URL
+# overrides the derived URL). Same tuning as the sync engine, which stays
+# around for the grouping jobs, migrations and exports.
+
+DB_ASYNC = _env_bool("DB_ASYNC", False)
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _async_url(url):
+    scheme, rest = url.split("://", 1)
+    return f"{_ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        **{k: v for k, v in ENGINE_OPTIONS.items() if k != "connect_args"},
+    )
+    if IS_SQLITE:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+def effective_settings():
+    """
+    What the engine is actually running with: pragma values read back
+    from a live SQLite connection, or the pool configuration and current
+    checkouts for other databases.
+    """
+    settings = {
+        "dialect": engine.dialect.name,
+        "driver": engine.dialect.driver,
+        "pool": type(engine.pool).__name__,
+        "pool_status": engine.pool.status(),
+        "async": DB_ASYNC,
+    }
+    if DB_ASYNC:
+        settings["async_driver"] = async_engine.dialect.driver
+        settings["async_pool_status"] = async_engine.pool.status()
+    if IS_SQLITE:
+        with engine.connect() as conn:
+            settings["pragmas"] = {
+                name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in SQLITE_PRAGMAS
+            }
+    else:
+        settings.update(ENGINE_OPTIONS)
+        settings["checked_out"] = engine.pool.checkedout()
+    return settings
+
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -33,3 +154,43 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# What get_session / session_scope hand out, depending on DB_ASYNC
+DbSession = Union[Session, AsyncSession]
+
+
+@asynccontextmanager
+async def session_scope():
+    """
+    An AsyncSession with DB_ASYNC on, the usual sync Session otherwise.
+    Do the DB work through run_db so the caller doesn't care which one it
+    got. Use directly where a request's dependencies are out of reach,
+    e.g. inside a streaming response body.
+    """
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
+async def get_session():
+    """Dependency for the async route handlers; see session_scope."""
+    async with session_scope() as db:
+        yield db
+
+
+async def run_db(db: DbSession, fn, *args, **kwargs):
+    """
+    Run fn(sync_session, *args, **kwargs) without blocking the event loop:
+    through AsyncSession.run_sync on the async engine, or on a worker
+    thread for a sync Session.
+    """
+    if DB_ASYNC:
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
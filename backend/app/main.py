@@ -1,12 +1,18 @@
 from fastapi import FastAPI
-from backend.app.routers import members, assessment
+from backend.app.routers import members, assessment, groups, diagnostics
 from fastapi.middleware.cors import CORSMiddleware 
 
 from backend.app.database import engine
-from backend.app import models
-
-# Auto-create any new tables (e.g. assessment_sessions) on startup
-models.Base.metadata.create_all(bind=engine)
+from backend.app.migrations import ensure_schema
+from backend.app.rl.trainer import shutdown_process_pool
+from backend.app.services.job_service import (
+    recover_interrupted_jobs,
+    shutdown_job_workers,
+    start_job_monitor,
+    stop_job_monitor,
+)
+from backend.app.services.crew_service import close_llm_clients
+from backend.app.services.ollama_health import start_health_monitor, stop_health_monitor
 
 app = FastAPI()
 
@@ -26,4 +32,27 @@ app.add_middleware(
 )
 app.include_router(members.router)
 app.include_router(assessment.router)
+app.include_router(groups.router)
+app.include_router(diagnostics.router)
+
+
+@app.on_event("startup")
+def _startup():
+    # Schema version check (migrates when behind, see backend/app/migrations)
+    ensure_schema(engine)
+    recover_interrupted_jobs()
+    start_job_monitor()
+    start_health_monitor()
+
+
+@app.on_event("shutdown")
+def _shutdown_workers():
+    stop_job_monitor()
+    shutdown_job_workers()
+    shutdown_process_pool()
+    stop_health_monitor()
+
 
+@app.on_event("shutdown")
+async def _close_llm_clients():
+    await close_llm_clients()
@@ -0,0 +1,100 @@
+"""
+backend/app/migrations
+-----------------------
+Versioned schema migrations.
+
+Each migration is a module in this package with an upgrade(conn)
+function, listed in MIGRATIONS in order. The schema_version table records
+which ones have run; each migration and its schema_version row commit in
+one transaction.
+
+Migrations define the tables and columns they create themselves instead
+of reading models.py, so every database, fresh or old, goes through the
+same steps. They must still be safe to rerun against a schema that
+already has their change (create with checkfirst, inspect before ALTER).
+
+On startup the app only reads the current version (ensure_schema) —
+one small query instead of reflecting every table. If the database is
+behind it is upgraded in place, or, with AUTO_MIGRATE=false, startup
+fails until someone runs:
+
+    python -m backend.app.migrations upgrade
+"""
+
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+
+from . import (
+    v0001_baseline,
+    v0002_hot_indexes,
+    v0003_assessment_turns,
+    v0004_context_summary,
+    v0005_roster_changes,
+    v0006_job_owners,
+)
+
+MIGRATIONS = [
+    (1, "baseline", v0001_baseline.upgrade),
+    (2, "hot_indexes", v0002_hot_indexes.upgrade),
+    (3, "assessment_turns", v0003_assessment_turns.upgrade),
+    (4, "context_summary", v0004_context_summary.upgrade),
+    (5, "roster_changes", v0005_roster_changes.upgrade),
+    (6, "job_owners", v0006_job_owners.upgrade),
+]
+
+HEAD = MIGRATIONS[-1][0]
+
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").strip().lower() in ("1", "true", "yes", "on")
+
+# Kept off models.Base so create_all in a migration never touches it
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def current_version(engine) -> int:
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_version.name):
+            return 0
+        return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(engine, target: int = HEAD) -> list:
+    """Apply every migration above the current version up to target. Returns the versions applied."""
+    _metadata.create_all(engine)
+    applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version > target or version <= current_version(engine):
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(schema_version.insert().values(
+                version=version, name=name, applied_at=datetime.now(timezone.utc),
+            ))
+        applied.append(version)
+    return applied
+
+
+def ensure_schema(engine, auto_migrate: bool = AUTO_MIGRATE) -> int:
+    """Startup check: upgrade (or refuse to start) if the schema is behind HEAD."""
+    version = current_version(engine)
+    if version >= HEAD:
+        return version
+    if not auto_migrate:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, the app needs {HEAD}. "
+            "Run `python -m backend.app.migrations upgrade`."
+        )
+    upgrade(engine)
+    return HEAD
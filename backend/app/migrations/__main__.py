@@ -0,0 +1,23 @@
+import argparse
+
+from backend.app.database import engine
+from backend.app.migrations import HEAD, MIGRATIONS, current_version, upgrade
+
+parser = argparse.ArgumentParser(prog="python -m backend.app.migrations", description="Manage the database schema version.")
+sub = parser.add_subparsers(dest="command", required=True)
+sub.add_parser("current", help="print the current and latest schema version")
+up = sub.add_parser("upgrade", help="apply pending migrations")
+up.add_argument("--to", type=int, default=HEAD, help="stop at this version")
+sub.add_parser("list", help="list all migrations")
+args = parser.parse_args()
+
+if args.command == "current":
+    print(f"current: {current_version(engine)}  head: {HEAD}")
+elif args.command == "list":
+    version = current_version(engine)
+    for v, name, _ in MIGRATIONS:
+        print(f"{'*' if v <= version else ' '} {v:04d} {name}")
+else:
+    applied = upgrade(engine, args.to)
+    print(f"Applied {applied}" if applied else "Already up to date")
+    print(f"current: {current_version(engine)}  head: {HEAD}")
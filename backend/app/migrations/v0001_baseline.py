@@ -0,0 +1,103 @@
+"""
+0001 — baseline.
+
+The schema as the old create_all-at-import code left it, frozen here
+rather than read from models.py: later migrations then do their work on
+every database, fresh or not, instead of finding it already done by a
+create_all of the current models.
+
+Creates whatever baseline tables are missing, so both an empty database
+and an existing one end up at the same starting point. Databases created
+before group snapshots / jobs carried a seed get that column added.
+"""
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    inspect,
+)
+
+metadata = MetaData()
+
+Table(
+    "members", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("category", String, nullable=False),
+)
+
+Table(
+    "domains", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False, unique=True),
+)
+
+Table(
+    "member_domains", metadata,
+    Column("member_id", Integer, ForeignKey("members.id"), primary_key=True),
+    Column("domain_id", Integer, ForeignKey("domains.id"), primary_key=True),
+)
+
+Table(
+    "assessment_sessions", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("student_name", String, nullable=False),
+    Column("domains", JSON, nullable=False),
+    Column("transcript", JSON, nullable=False),
+    Column("scores", JSON, nullable=True),
+    Column("status", String),
+    Column("created_at", DateTime),
+    Column("completed_at", DateTime, nullable=True),
+)
+
+Table(
+    "roster_versions", metadata,
+    Column("domain_id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+Table(
+    "group_snapshots", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("domain_id", Integer, nullable=False, index=True),
+    Column("roster_version", Integer, nullable=False),
+    Column("groups", JSON, nullable=False),
+    Column("total_reward", Integer, nullable=False),
+    Column("seed", BigInteger, nullable=True),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "group_jobs", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("kind", String, nullable=False),
+    Column("domain_id", Integer, nullable=False),
+    Column("seed", BigInteger, nullable=True),
+    Column("status", String),
+    Column("progress", Float, nullable=False),
+    Column("message", String, nullable=True),
+    Column("result", JSON, nullable=True),
+    Column("error", String, nullable=True),
+    Column("created_at", DateTime),
+    Column("started_at", DateTime, nullable=True),
+    Column("finished_at", DateTime, nullable=True),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn)
+
+    inspector = inspect(conn)
+    for table in ("group_snapshots", "group_jobs"):
+        if "seed" not in {c["name"] for c in inspector.get_columns(table)}:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN seed {BigInteger().compile(conn.dialect)}"
+            )
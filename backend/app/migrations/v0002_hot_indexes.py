@@ -0,0 +1,22 @@
+"""
+0002 — indexes on hot filter columns.
+
+    member_domains.domain_id           domain rosters (the composite PK
+                                       leads with member_id)
+    members.category                   category filters / counts
+    assessment_sessions(status, created_at)
+                                       /assess/results by status, newest first
+    assessment_sessions.created_at     /assess/results unfiltered, newest first
+"""
+
+INDEXES = [
+    ("ix_member_domains_domain_id", "member_domains", ("domain_id",)),
+    ("ix_members_category", "members", ("category",)),
+    ("ix_assessment_sessions_status_created_at", "assessment_sessions", ("status", "created_at")),
+    ("ix_assessment_sessions_created_at", "assessment_sessions", ("created_at",)),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
@@ -0,0 +1,94 @@
+"""
+0003 — append-only assessment_turns.
+
+Transcripts move out of the assessment_sessions.transcript JSON column
+(rewritten whole on every message) into one assessment_turns row per
+message. Sessions get a turn_count holding the next seq. Existing
+transcripts are copied over in batches, then the column is dropped
+(SQLite needs 3.35+ for DROP COLUMN).
+"""
+
+import json
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    bindparam,
+    inspect,
+    insert,
+    select,
+    update,
+)
+
+BATCH_SESSIONS = 500
+
+metadata = MetaData()
+
+# Only there for the foreign key to resolve
+Table("assessment_sessions", metadata, Column("id", Integer, primary_key=True))
+
+turns = Table(
+    "assessment_turns", metadata,
+    Column("session_id", Integer, ForeignKey("assessment_sessions.id", ondelete="CASCADE"), primary_key=True),
+    Column("seq", Integer, primary_key=True),
+    Column("role", String, nullable=False),
+    Column("content", Text, nullable=False),
+    Column("prompt_tokens", Integer, nullable=True),
+    Column("completion_tokens", Integer, nullable=True),
+    Column("latency_ms", Float, nullable=True),
+    Column("created_at", DateTime),
+)
+
+
+def upgrade(conn):
+    turns.create(conn, checkfirst=True)
+
+    columns = {c["name"] for c in inspect(conn).get_columns("assessment_sessions")}
+    if "turn_count" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE assessment_sessions "
+            f"ADD COLUMN turn_count {Integer().compile(conn.dialect)} NOT NULL DEFAULT 0"
+        )
+    if "transcript" not in columns:
+        return
+
+    sessions = Table("assessment_sessions", MetaData(), autoload_with=conn)
+    last_id = 0
+    while True:
+        batch = conn.execute(
+            select(sessions.c.id, sessions.c.transcript, sessions.c.created_at)
+            .where(sessions.c.id > last_id)
+            .order_by(sessions.c.id)
+            .limit(BATCH_SESSIONS)
+        ).all()
+        if not batch:
+            break
+        rows, counts = [], []
+        for session_id, transcript, created_at in batch:
+            if isinstance(transcript, str):
+                transcript = json.loads(transcript)
+            transcript = transcript or []
+            rows += [
+                {"session_id": session_id, "seq": seq, "role": t["role"],
+                 "content": t["content"], "created_at": created_at}
+                for seq, t in enumerate(transcript)
+            ]
+            counts.append({"b_id": session_id, "b_count": len(transcript)})
+        if rows:
+            conn.execute(insert(turns), rows)
+        conn.execute(
+            update(sessions)
+            .where(sessions.c.id == bindparam("b_id"))
+            .values(turn_count=bindparam("b_count")),
+            counts,
+        )
+        last_id = batch[-1][0]
+
+    conn.exec_driver_sql("ALTER TABLE assessment_sessions DROP COLUMN transcript")
@@ -0,0 +1,24 @@
+"""
+0004 — rolling context summary on assessment_sessions.
+
+    context_summary    summary of the turns before summary_through
+    summary_through    first turn seq not folded into the summary
+
+Existing sessions start unsummarized (summary_through 0); their early
+turns get folded in as the interview continues.
+"""
+
+from sqlalchemy import Integer, Text, inspect
+
+
+def upgrade(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("assessment_sessions")}
+    if "context_summary" not in columns:
+        conn.exec_driver_sql(
+            f"ALTER TABLE assessment_sessions ADD COLUMN context_summary {Text().compile(conn.dialect)}"
+        )
+    if "summary_through" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE assessment_sessions "
+            f"ADD COLUMN summary_through {Integer().compile(conn.dialect)} NOT NULL DEFAULT 0"
+        )
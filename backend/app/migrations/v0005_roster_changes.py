@@ -0,0 +1,23 @@
+"""
+0005 — roster_changes.
+
+One row per roster version bump listing the members it touched, so a
+stale group snapshot can be repaired from just those members. Versions
+bumped before this migration have no row; snapshots older than that are
+recomputed once instead of repaired.
+"""
+
+from sqlalchemy import JSON, Column, Integer, MetaData, Table
+
+metadata = MetaData()
+
+roster_changes = Table(
+    "roster_changes", metadata,
+    Column("domain_id", Integer, primary_key=True),
+    Column("version", Integer, primary_key=True),
+    Column("member_ids", JSON, nullable=False),
+)
+
+
+def upgrade(conn):
+    roster_changes.create(conn, checkfirst=True)
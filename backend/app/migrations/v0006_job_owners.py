@@ -0,0 +1,21 @@
+"""
+0006 — owner / heartbeat_at on group_jobs.
+
+    owner          worker process running the job
+    heartbeat_at   last sign of life from that process
+
+Unfinished jobs from before this migration have neither and are failed
+as orphaned on the next startup, as they were before.
+"""
+
+from sqlalchemy import DateTime, String, inspect
+
+
+def upgrade(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("group_jobs")}
+    if "owner" not in columns:
+        conn.exec_driver_sql(f"ALTER TABLE group_jobs ADD COLUMN owner {String().compile(conn.dialect)}")
+    if "heartbeat_at" not in columns:
+        conn.exec_driver_sql(
+            f"ALTER TABLE group_jobs ADD COLUMN heartbeat_at {DateTime().compile(conn.dialect)}"
+        )
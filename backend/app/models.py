@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime, timezone
@@ -9,7 +9,7 @@ class Member(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    category = Column(String, nullable=False)
+    category = Column(String, nullable=False, index=True)
 
     domains = relationship(
         "Domain",
@@ -35,17 +35,85 @@ class MemberDomain(Base):
     __tablename__ = "member_domains"
 
     member_id = Column(Integer, ForeignKey("members.id"), primary_key=True)
-    domain_id = Column(Integer, ForeignKey("domains.id"), primary_key=True)
+    domain_id = Column(Integer, ForeignKey("domains.id"), primary_key=True, index=True)
 
 
 class AssessmentSession(Base):
     __tablename__ = "assessment_sessions"
+    __table_args__ = (
+        Index("ix_assessment_sessions_status_created_at", "status", "created_at"),
+        Index("ix_assessment_sessions_created_at", "created_at"),
+    )
 
     id            = Column(Integer, primary_key=True, index=True)
     student_name  = Column(String, nullable=False)
     domains       = Column(JSON, nullable=False, default=list)  # ["AI", "Web Dev"]
-    transcript    = Column(JSON, nullable=False, default=list)  # [{role, content}, ...]
+    turn_count    = Column(Integer, nullable=False, default=0)  # turns stored = next AssessmentTurn.seq
+    context_summary = Column(Text, nullable=True)              # rolling summary of turns seq < summary_through
+    summary_through = Column(Integer, nullable=False, default=0)
     scores        = Column(JSON, nullable=True)                 # {domain_knowledge, creativity, ...}
     status        = Column(String, default="active")           # "active" | "scored"
     created_at    = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     completed_at  = Column(DateTime, nullable=True)
+
+
+class AssessmentTurn(Base):
+    """One message of an assessment transcript. Rows are only ever appended."""
+    __tablename__ = "assessment_turns"
+
+    session_id        = Column(Integer, ForeignKey("assessment_sessions.id", ondelete="CASCADE"), primary_key=True)
+    seq               = Column(Integer, primary_key=True)   # 0-based position in the transcript
+    role              = Column(String, nullable=False)       # "student" | "agent"
+    content           = Column(Text, nullable=False)
+    prompt_tokens     = Column(Integer, nullable=True)       # agent turns: tokens in the prompt
+    completion_tokens = Column(Integer, nullable=True)       # agent turns: tokens generated
+    latency_ms        = Column(Float, nullable=True)         # agent turns: time spent generating
+    created_at        = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class RosterVersion(Base):
+    __tablename__ = "roster_versions"
+
+    # domain_id 0 = the whole members table
+    domain_id = Column(Integer, primary_key=True)
+    version   = Column(Integer, nullable=False, default=0)
+
+
+class RosterChange(Base):
+    __tablename__ = "roster_changes"
+
+    # Members added, removed or edited by one roster version bump
+    domain_id  = Column(Integer, primary_key=True)                # 0 = the whole members table
+    version    = Column(Integer, primary_key=True)
+    member_ids = Column(JSON, nullable=False, default=list)
+
+
+class GroupSnapshot(Base):
+    __tablename__ = "group_snapshots"
+
+    id             = Column(Integer, primary_key=True, index=True)
+    domain_id      = Column(Integer, nullable=False, index=True)  # 0 = all members
+    roster_version = Column(Integer, nullable=False)
+    groups         = Column(JSON, nullable=False, default=list)   # [{group_id, group, reward}, ...]
+    total_reward   = Column(Integer, nullable=False, default=0)
+    seed           = Column(BigInteger, nullable=True)            # None = repaired from an older snapshot
+    created_at     = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class GroupJob(Base):
+    __tablename__ = "group_jobs"
+
+    id           = Column(Integer, primary_key=True, index=True)
+    kind         = Column(String, nullable=False)                # "domain" | "all_domains"
+    domain_id    = Column(Integer, nullable=False, default=0)    # 0 = all members
+    seed         = Column(BigInteger, nullable=True)
+    status       = Column(String, default="queued")              # "queued" | "running" | "done" | "failed"
+    progress     = Column(Float, nullable=False, default=0.0)    # 0.0 - 1.0
+    message      = Column(String, nullable=True)
+    result       = Column(JSON, nullable=True)
+    error        = Column(String, nullable=True)
+    owner        = Column(String, nullable=True)                 # job_service.WORKER_ID of the process running it
+    heartbeat_at = Column(DateTime, nullable=True)               # refreshed by the owner while it is alive
+    created_at   = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at   = Column(DateTime, nullable=True)
+    finished_at  = Column(DateTime, nullable=True)
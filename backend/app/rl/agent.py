@@ -1,7 +1,12 @@
 
 import random
 
+import numpy as np
+
 class SimpleRLAgent:
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
     def select_action(self, state):
         
         if state["senior"] == 0:
@@ -16,4 +21,46 @@ class SimpleRLAgent:
         if state["group_size"] >= 3:
             return 3 
             
-        return random.choice([0, 1, 2])
\ No newline at end of file
+        return self.rng.choice([0, 1, 2])
+
+
+class BatchRLAgent:
+    """Same rules as SimpleRLAgent, applied to a (n_envs, 4) state array."""
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def select_actions(self, states):
+        size, senior, intermediate, junior = states.T
+
+        actions = self.rng.integers(0, 3, size=len(states))
+        actions[size >= 3] = 3
+        actions[junior == 0] = 2
+        actions[intermediate == 0] = 1
+        actions[senior == 0] = 0
+        return actions
+
+
+class QPolicyAgent:
+    """
+    Greedy lookup into a trained Q table (see rl/qlearning.py).
+
+    available maps category -> how many such members the roster has;
+    actions that would hit an empty pool are masked out instead of
+    costing a wasted -1 step.
+    """
+
+    CATEGORIES = ("senior", "intermediate", "junior")
+
+    def __init__(self, q_table, available=None):
+        self.q = q_table
+        self.available = available
+
+    def select_action(self, state):
+        values = self.q[state["senior"], state["intermediate"], state["junior"]]
+
+        if self.available is not None:
+            valid = [state[c] < self.available.get(c, 0) for c in self.CATEGORIES] + [True]
+            values = np.where(valid, values, -np.inf)
+
+        return int(values.argmax())
@@ -0,0 +1,129 @@
+"""
+backend/app/rl/batch_env.py
+----------------------------
+NumPy-backed version of GroupEnv that advances many independent episodes
+per call.
+
+The roster is held as a Roster (integer id + category code columns) and
+each category keeps its own index pool, so picking a candidate is a
+random draw into that pool instead of a scan over every member.
+Actions, states and rewards mirror GroupEnv:
+
+    actions : 0 = add senior, 1 = add intermediate, 2 = add junior, 3 = stop
+    state   : [group_size, senior, intermediate, junior]
+"""
+
+import numpy as np
+
+from .roster import CATEGORIES, Roster
+from .scoring import DEFAULT_ENGINE, MAX_GROUP_SIZE, MIN_GROUP_SIZE
+
+STOP_ACTION = 3
+
+# Sentinel used to pad unused slots when sorting pool positions
+_FAR = np.iinfo(np.int64).max
+
+
+def evaluate_counts(counts: np.ndarray, sizes=None) -> np.ndarray:
+    """
+    Vectorized GroupEnv._evaluate (a lookup in the default scoring table).
+
+    counts: (n, 3) array of senior / intermediate / junior counts.
+    sizes:  (n,) group sizes, if the groups may hold members outside the
+            three categories. Defaults to the row sums of counts.
+    Returns an (n,) int array of rewards.
+    """
+    return DEFAULT_ENGINE.score(counts, sizes)
+
+
+class BatchGroupEnv:
+    def __init__(self, members, n_envs: int, rng=None, scoring=None):
+        self.roster = Roster.coerce(members)
+        self.scoring = scoring or DEFAULT_ENGINE
+        self.n_envs = int(n_envs)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # Roster indices of each category, and how many of them exist
+        self.pools = [self.roster.indices(c) for c in range(len(CATEGORIES))]
+        self.pool_sizes = np.array([len(p) for p in self.pools], dtype=np.int64)
+
+        self.reset()
+
+    def reset(self):
+        n = self.n_envs
+        # Per slot: category code and position inside that category's pool
+        self.slot_cat = np.full((n, MAX_GROUP_SIZE), -1, dtype=np.int8)
+        self.slot_pos = np.full((n, MAX_GROUP_SIZE), -1, dtype=np.int64)
+        self.counts = np.zeros((n, len(CATEGORIES)), dtype=np.int64)
+        self.sizes = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        return self._state()
+
+    def _state(self):
+        return np.column_stack([self.sizes, self.counts])
+
+    def valid_actions(self):
+        """(n_envs, 4) bool mask of actions that will not be rejected."""
+        mask = np.ones((self.n_envs, len(CATEGORIES) + 1), dtype=bool)
+        mask[:, : len(CATEGORIES)] = self.counts < self.pool_sizes
+        mask[self.done] = False
+        return mask
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.zeros(self.n_envs, dtype=np.int64)
+        active = ~self.done
+
+        stop = active & (actions == STOP_ACTION)
+        invalid = active & ((actions < 0) | (actions > STOP_ACTION))
+        rewards[invalid] = -1
+
+        for c in range(len(CATEGORIES)):
+            wants = active & (actions == c)
+            if not wants.any():
+                continue
+            exhausted = wants & (self.counts[:, c] >= self.pool_sizes[c])
+            rewards[exhausted] = -1
+            self._add(np.flatnonzero(wants & ~exhausted), c)
+
+        full = active & (self.sizes >= MAX_GROUP_SIZE)
+        finished = stop | full
+        if finished.any():
+            rewards[finished] = self.scoring.score(self.counts[finished], self.sizes[finished])
+            self.done |= finished
+
+        return self._state(), rewards, self.done.copy()
+
+    def _add(self, envs, c):
+        """Add one random unused member of category c to each env in envs."""
+        if len(envs) == 0:
+            return
+
+        taken = self.counts[envs, c]
+        # Draw among the members not yet in the group, then shift the draw
+        # past every already-taken pool position (sorted ascending).
+        draw = self.rng.integers(0, self.pool_sizes[c] - taken)
+        used = np.where(self.slot_cat[envs] == c, self.slot_pos[envs], _FAR)
+        used.sort(axis=1)
+        for k in range(MAX_GROUP_SIZE):
+            draw += draw >= used[:, k]
+
+        slot = self.sizes[envs]
+        self.slot_cat[envs, slot] = c
+        self.slot_pos[envs, slot] = draw
+        self.counts[envs, c] += 1
+        self.sizes[envs] += 1
+
+    def group_indices(self, env: int):
+        """Roster indices of the members in one env's group, in pick order."""
+        size = self.sizes[env]
+        cats = self.slot_cat[env, :size]
+        pos = self.slot_pos[env, :size]
+        return np.array([self.pools[c][p] for c, p in zip(cats, pos)], dtype=np.int64)
+
+    def group(self, env: int):
+        """Member dicts of one env's group, same shape as GroupEnv.group."""
+        return self.roster.members(self.group_indices(env))
+
+    def evaluate(self):
+        return self.scoring.score(self.counts, self.sizes)
@@ -1,22 +1,36 @@
 
 import random
 
+from .roster import CATEGORIES, Roster
+from .scoring import DEFAULT_ENGINE
+
 class GroupEnv:
-    def __init__(self, members):
-        self.members = members
+    def __init__(self, members, scoring=None, rng=None):
+        self.roster = Roster.coerce(members)
+        self.scoring = scoring or DEFAULT_ENGINE
+        # Own random.Random per env (see rl/seeding.py), never the global one
+        self.rng = rng if rng is not None else random.Random()
+        # Roster indices of each category, so a pick never scans the roster
+        self.pools = [self.roster.indices(c) for c in range(len(CATEGORIES))]
         self.reset()
 
     def reset(self):
-        self.group = []
+        self.group_indices = []
+        self.counts = [0] * len(CATEGORIES)
         self.done = False
         return self._state()
 
+    @property
+    def group(self):
+        """Member dicts of the current group (names resolved on demand)."""
+        return self.roster.members(self.group_indices)
+
     def _state(self):
         return {
-            "group_size": len(self.group),
-            "senior": sum(1 for m in self.group if m["category"] == "senior"),
-        "intermediate": sum(1 for m in self.group if m["category"] == "intermediate"),
-            "junior": sum(1 for m in self.group if m["category"] == "junior"),
+            "group_size": len(self.group_indices),
+            "senior": self.counts[0],
+            "intermediate": self.counts[1],
+            "junior": self.counts[2],
         }
 
     def step(self, action):
@@ -31,23 +45,22 @@ class GroupEnv:
         if action >= len(category_map):
              return self._state(), -1, False
              
-        category = category_map[action]
-
+        pool = self.pools[action]
 
-        current_ids = {g["id"] for g in self.group}
-        candidates = [
-            m for m in self.members 
-            if m["category"] == category and m["id"] not in current_ids
-        ]
-
-        if not candidates:
+        if self.counts[action] >= len(pool):
             return self._state(), -1, False 
 
-      
-        self.group.append(random.choice(candidates))
+        # At most 4 members are already taken, so redrawing on a clash is cheap
+        taken = set(self.group_indices)
+        index = int(pool[self.rng.randrange(len(pool))])
+        while index in taken:
+            index = int(pool[self.rng.randrange(len(pool))])
+
+        self.group_indices.append(index)
+        self.counts[action] += 1
 
        
-        if len(self.group) >= 5:
+        if len(self.group_indices) >= 5:
             self.done = True
             reward = self._evaluate()
             return self._state(), reward, self.done
@@ -55,14 +68,5 @@ class GroupEnv:
         return self._state(), 0, self.done
 
     def _evaluate(self):
-        s = self._state()
-
-        if s["group_size"] < 3 or s["group_size"] > 5:
-            return -2
-
-        reward = 0
-        if s["senior"] >= 1: reward += 3
-        if s["intermediate"] >= 1: reward += 2
-        if s["junior"] >= 1: reward += 1
-
-        return reward
\ No newline at end of file
+        # Reward rules live in rl/scoring.py, precompiled into a lookup table
+        return self.scoring.score_one(*self.counts, len(self.group_indices))
@@ -0,0 +1,490 @@
+"""
+backend/app/rl/partition.py
+----------------------------
+Whole-roster partitioning: every member ends up in a group of 3-5.
+
+Construction (linear apart from one argsort over groups):
+  1. Use as many groups as the roster allows (n // 3). GroupEnv's reward
+     only grows with the number of groups that contain each category, so
+     more groups is never worse.
+  2. Give each group one senior, one intermediate and one junior while
+     they last (coverage), always topping up the emptiest groups first.
+  3. Deal the remaining members round-robin into the free slots.
+
+For the GroupEnv reward this is already optimal. The local-search pass
+(random swaps / moves between groups, accepted when they raise the total
+score) is there for other count-based scorers, and stops when it runs out
+of its time budget or stops finding improvements. Seeded searches are
+capped by a round count instead of the clock (seeded_rounds), so a seed
+replays the same grouping however fast the machine is.
+"""
+
+import heapq
+import math
+import time
+
+import numpy as np
+
+from .batch_env import MAX_GROUP_SIZE, MIN_GROUP_SIZE, evaluate_counts
+from .roster import CATEGORIES, CATEGORY_CODES, Roster
+
+N_CATEGORIES = len(CATEGORIES)
+
+# Nominal cost of one search round (a mid-size roster's), for turning a
+# time budget into a round cap
+SEEDED_ROUND_SECONDS = 0.004
+
+
+def seeded_rounds(time_budget) -> int:
+    """Round cap that stands in for time_budget when the search is seeded."""
+    return math.ceil(time_budget / SEEDED_ROUND_SECONDS) if time_budget > 0 else 0
+
+
+def _group_counts(assignment, categories, n_groups):
+    counts = np.zeros((n_groups, N_CATEGORIES), dtype=np.int64)
+    known = categories < N_CATEGORIES
+    np.add.at(counts, (assignment[known], categories[known]), 1)
+    sizes = np.bincount(assignment, minlength=n_groups).astype(np.int64)
+    return counts, sizes
+
+
+def build_assignment(categories):
+    """
+    Constructive pass. categories is an (n,) array of Roster category
+    codes (anything >= 3 is outside the scored categories). Returns (assignment, n_groups) where
+    assignment[i] is the group index of member i.
+    """
+    n = len(categories)
+    if n < MIN_GROUP_SIZE:
+        return np.zeros(n, dtype=np.int64), (1 if n else 0)
+
+    n_groups = n // MIN_GROUP_SIZE
+    capacity = np.full(n_groups, MIN_GROUP_SIZE, dtype=np.int64)
+    # n % 3 extra seats, spread one per group (a lone group may take both)
+    np.add.at(capacity, np.arange(n - n_groups * MIN_GROUP_SIZE) % n_groups, 1)
+
+    assignment = np.full(n, -1, dtype=np.int64)
+    fill = np.zeros(n_groups, dtype=np.int64)
+
+    # Coverage: one of each category per group, emptiest groups first
+    for c in range(N_CATEGORIES):
+        pool = np.flatnonzero(categories == c)
+        take = min(len(pool), n_groups)
+        if take == 0:
+            continue
+        targets = np.argsort(fill, kind="stable")[:take]
+        assignment[pool[:take]] = targets
+        fill[targets] += 1
+
+    # Everyone else goes round-robin into the free slots, grouped by
+    # category so each one spreads across as many groups as possible
+    rest = np.flatnonzero(assignment < 0)
+    if len(rest):
+        rest = rest[np.argsort(categories[rest], kind="stable")]
+        free = capacity - fill
+        slot_groups = np.repeat(np.arange(n_groups), free)
+        # k-th free slot of every group comes before any (k+1)-th slot
+        starts = np.cumsum(free) - free
+        slot_rank = np.arange(len(slot_groups)) - np.repeat(starts, free)
+        slot_groups = slot_groups[np.argsort(slot_rank, kind="stable")]
+        assignment[rest] = slot_groups
+
+    return assignment, n_groups
+
+
+def refine_assignment(
+    assignment,
+    categories,
+    n_groups,
+    score=evaluate_counts,
+    time_budget=0.05,
+    batch_size=4096,
+    patience=5,
+    rng=None,
+    max_rounds=None,
+):
+    """
+    Local search over an existing assignment, in place.
+
+    score(counts, sizes) -> per-group scores. Each round samples
+    batch_size random swaps and moves, keeps the improving ones that touch
+    disjoint groups, and applies them. Stops after time_budget seconds —
+    or after max_rounds rounds when given, which makes a seeded rng
+    reproducible — or `patience` rounds in a row without an improvement.
+    Returns the number of accepted changes.
+    """
+    n = len(assignment)
+    if n_groups < 2 or time_budget <= 0:
+        return 0
+
+    rng = rng if rng is not None else np.random.default_rng()
+    counts, sizes = _group_counts(assignment, categories, n_groups)
+    onehot = np.vstack([np.eye(N_CATEGORIES, dtype=np.int64), np.zeros(N_CATEGORIES, dtype=np.int64)])
+
+    deadline = time.perf_counter() + time_budget
+    accepted = 0
+    idle = 0
+    rounds = 0
+
+    while idle < patience and (
+        rounds < max_rounds if max_rounds is not None else time.perf_counter() < deadline
+    ):
+        rounds += 1
+        a = rng.integers(0, n, size=batch_size)
+        b = rng.integers(0, n, size=batch_size)
+        ga, gb = assignment[a], assignment[b]
+        ca = onehot[np.minimum(categories[a], N_CATEGORIES)]
+        cb = onehot[np.minimum(categories[b], N_CATEGORIES)]
+        old = score(counts[ga], sizes[ga]) + score(counts[gb], sizes[gb])
+
+        # Swap a <-> b
+        swap_gain = (
+            score(counts[ga] - ca + cb, sizes[ga])
+            + score(counts[gb] - cb + ca, sizes[gb])
+            - old
+        )
+        swap_gain[(ga == gb) | (categories[a] == categories[b])] = 0
+
+        # Move a into b's group
+        move_ok = (ga != gb) & (sizes[ga] > MIN_GROUP_SIZE) & (sizes[gb] < MAX_GROUP_SIZE)
+        move_gain = (
+            score(counts[ga] - ca, sizes[ga] - 1)
+            + score(counts[gb] + ca, sizes[gb] + 1)
+            - old
+        )
+        move_gain[~move_ok] = 0
+
+        is_move = move_gain > swap_gain
+        gain = np.where(is_move, move_gain, swap_gain)
+        candidates = np.flatnonzero(gain > 0)
+
+        touched = set()
+        applied = 0
+        for k in candidates[np.argsort(-gain[candidates], kind="stable")]:
+            g1, g2 = ga[k], gb[k]
+            if g1 in touched or g2 in touched:
+                continue
+            touched.update((g1, g2))
+
+            counts[g1] -= ca[k]
+            counts[g2] += ca[k]
+            assignment[a[k]] = g2
+            if is_move[k]:
+                sizes[g1] -= 1
+                sizes[g2] += 1
+            else:
+                counts[g2] -= cb[k]
+                counts[g1] += cb[k]
+                assignment[b[k]] = g1
+            applied += 1
+
+        accepted += applied
+        idle = 0 if applied else idle + 1
+
+    return accepted
+
+
+def partition_roster(roster, time_budget=0.05, score=evaluate_counts, rng=None, max_rounds=None):
+    """
+    Array-only partition of a Roster: returns (assignment, rewards) where
+    assignment[i] is the group index of roster member i and rewards holds
+    one score per group. Cheap to ship back from a worker process.
+    """
+    categories = roster.categories
+    assignment, n_groups = build_assignment(categories)
+    refine_assignment(
+        assignment, categories, n_groups,
+        score=score, time_budget=time_budget, rng=rng, max_rounds=max_rounds,
+    )
+    counts, sizes = _group_counts(assignment, categories, n_groups)
+    return assignment, score(counts, sizes)
+
+
+def groups_from_assignment(roster, assignment, rewards):
+    """Turn partition_roster output into [{"group_id", "group", "reward"}, ...]."""
+    if len(roster) == 0:
+        return []
+
+    order = np.argsort(assignment, kind="stable")
+    members = roster.members(order)   # already in group order
+    bounds = np.cumsum(np.bincount(assignment, minlength=len(rewards))).tolist()
+
+    return [
+        {
+            "group_id": g + 1,
+            "group": members[start:end],
+            "reward": reward,
+        }
+        for g, (start, end, reward) in enumerate(zip([0] + bounds[:-1], bounds, rewards.tolist()))
+    ]
+
+
+def partition_members(members, time_budget=0.05, score=evaluate_counts, rng=None, max_rounds=None):
+    """
+    Split the whole roster into groups of 3-5.
+
+    members: a Roster or a list of {"id", "name", "category"} dicts.
+    Returns a list of {"group_id", "group", "reward"} dicts, the same
+    shape generate_all_groups_deterministic has always returned. Rosters
+    smaller than 3 come back as a single (invalid, -2) group so nobody is
+    dropped.
+    """
+    roster = Roster.coerce(members)
+    if len(roster) == 0:
+        return []
+
+    assignment, rewards = partition_roster(roster, time_budget, score, rng, max_rounds)
+    return groups_from_assignment(roster, assignment, rewards)
+
+
+# ── Incremental repair ─────────────────────────────────────────────────────
+
+class _GroupState:
+    """
+    Mutable view of a list of {"group_id", "group", "reward"} dicts.
+
+    Scores are count-based, so groups with the same category counts and
+    size score the same: groups are bucketed by that signature and a
+    candidate move is scored once per bucket instead of once per group
+    (ties go to the lowest group index, kept in a heap per bucket).
+    Per-group scores are cached and only recomputed for groups that change.
+    """
+
+    def __init__(self, groups, score):
+        self.score = score
+        self.ids = [g["group_id"] for g in groups]
+        self.members = [list(g["group"]) for g in groups]
+        self.counts = np.zeros((len(groups), N_CATEGORIES), dtype=np.int64)
+        self.sizes = np.zeros(len(groups), dtype=np.int64)
+        self.where = {}
+        for k, group in enumerate(self.members):
+            for m in group:
+                self.where[m["id"]] = k
+                c = CATEGORY_CODES.get(m["category"], -1)
+                if c >= 0:
+                    self.counts[k, c] += 1
+            self.sizes[k] = len(group)
+        self.scores = score(self.counts, self.sizes) if len(groups) else np.zeros(0, dtype=np.int64)
+        self.buckets = {}   # signature -> set of group indices
+        self.heaps = {}     # signature -> heap of those indices (may hold stale ones)
+        for k in range(len(self.members)):
+            self.buckets.setdefault(self._signature(k), set()).add(k)
+        for key, ks in self.buckets.items():
+            self.heaps[key] = sorted(ks)
+
+    def _signature(self, k):
+        return tuple(self.counts[k].tolist()), int(self.sizes[k])
+
+    def _enter(self, k):
+        key = self._signature(k)
+        if key not in self.buckets:
+            self.buckets[key], self.heaps[key] = set(), []
+        self.buckets[key].add(k)
+        heapq.heappush(self.heaps[key], k)
+
+    def _leave(self, k):
+        key = self._signature(k)
+        self.buckets[key].discard(k)
+        if not self.buckets[key]:
+            del self.buckets[key], self.heaps[key]
+
+    def _lowest(self, key, skip=None):
+        """Lowest group index in a bucket other than skip; None if there is none."""
+        ks, heap = self.buckets[key], self.heaps[key]
+        held = None
+        while heap and (heap[0] not in ks or heap[0] == skip):
+            k = heapq.heappop(heap)
+            if k == skip and k in ks:
+                held = k
+        lowest = heap[0] if heap else None
+        if held is not None:
+            heapq.heappush(heap, held)
+        return lowest
+
+    def _count(self, k, member, delta):
+        self._leave(k)
+        c = CATEGORY_CODES.get(member["category"], -1)
+        if c >= 0:
+            self.counts[k, c] += delta
+        self.sizes[k] += delta
+        self.scores[k] = self.score(self.counts[k][None], self.sizes[k:k + 1])[0]
+        self._enter(k)
+
+    def add(self, k, member):
+        self.members[k].append(member)
+        self.where[member["id"]] = k
+        self._count(k, member, 1)
+
+    def remove(self, k, member):
+        self.members[k] = [m for m in self.members[k] if m["id"] != member["id"]]
+        self.where.pop(member["id"], None)
+        self._count(k, member, -1)
+
+    def replace(self, k, member):
+        """Swap in new details for a member whose category hasn't changed."""
+        self.members[k] = [member if m["id"] == member["id"] else m for m in self.members[k]]
+
+    def new_group(self):
+        self.ids.append(max(self.ids, default=0) + 1)
+        self.members.append([])
+        self.counts = np.vstack([self.counts, np.zeros(N_CATEGORIES, dtype=np.int64)])
+        self.sizes = np.append(self.sizes, 0)
+        self.scores = np.append(self.scores, 0)
+        k = len(self.members) - 1
+        self.scores[k] = self.score(self.counts[k][None], self.sizes[k:k + 1])[0]
+        self._enter(k)
+        return k
+
+    def _bucket_arrays(self, keep):
+        """(signatures, counts, sizes) of the buckets keep(signature) accepts."""
+        keys = [key for key in self.buckets if keep(key)]
+        counts = np.array([key[0] for key in keys], dtype=np.int64).reshape(-1, N_CATEGORIES)
+        sizes = np.array([key[1] for key in keys], dtype=np.int64)
+        return keys, counts, sizes
+
+    def best_group_for(self, member, exclude=None, emptiest=True):
+        """
+        Group member should join (other than group exclude): the highest
+        score gain, then (with emptiest) the smallest group, then the
+        lowest index. None if every group is full.
+        """
+        keys, counts, sizes = self._bucket_arrays(lambda key: key[1] < MAX_GROUP_SIZE)
+        if not keys:
+            return None
+        delta = np.zeros(N_CATEGORIES, dtype=np.int64)
+        c = CATEGORY_CODES.get(member["category"], -1)
+        if c >= 0:
+            delta[c] = 1
+        gain = (self.score(counts + delta, sizes + 1) - self.score(counts, sizes)).tolist()
+
+        best = None
+        for key, g in zip(keys, gain):
+            k = self._lowest(key, exclude)
+            if k is not None:
+                rank = (-g, key[1] if emptiest else 0, k)
+                if best is None or rank < best:
+                    best = rank
+        return None if best is None else best[2]
+
+    def best_pull(self, k):
+        """
+        Best single member to move into group k from a group that can
+        spare one (size > 3). Returns (donor, member, gain) or None.
+        """
+        best = None
+        for c in range(N_CATEGORIES):
+            delta = np.eye(N_CATEGORIES, dtype=np.int64)[c]
+            keys, counts, sizes = self._bucket_arrays(
+                lambda key: key[1] > MIN_GROUP_SIZE and key[0][c] > 0
+            )
+            if not keys:
+                continue
+            loss = (self.score(counts - delta, sizes - 1) - self.score(counts, sizes)).tolist()
+            gain_k = (
+                self.score((self.counts[k] + delta)[None], self.sizes[k:k + 1] + 1)[0]
+                - self.scores[k]
+            )
+            # Highest total, then the lowest donor index
+            choice = None
+            for key, l in zip(keys, loss):
+                d = self._lowest(key, k)
+                if d is not None and (choice is None or (-l, d) < choice):
+                    choice = (-l, d)
+            if choice is None:
+                continue
+            total, d = float(-choice[0] + gain_k), choice[1]
+            if best is None or total > best[2]:
+                member = next(m for m in self.members[d] if CATEGORY_CODES.get(m["category"]) == c)
+                best = (d, member, total)
+        return best
+
+
+def repair_groups(groups, added=(), removed_ids=(), score=evaluate_counts):
+    """
+    Patch an existing grouping after a membership change instead of
+    re-partitioning the roster.
+
+    groups:      current [{"group_id", "group", "reward"}, ...]
+    added:       new or changed member dicts; a member already grouped
+                 keeps their group (with the new details) unless their
+                 category changed
+    removed_ids: ids of members who left
+
+    Only groups that lose or gain someone (plus the donors pulled from to
+    refill them) change or get rescored; everyone else keeps their group.
+    Returns (groups, changed_group_ids).
+    """
+    state = _GroupState(groups, score)
+    touched = set()
+
+    def remove(member_id):
+        k = state.where.get(member_id)
+        if k is not None:
+            member = next(m for m in state.members[k] if m["id"] == member_id)
+            state.remove(k, member)
+            touched.add(k)
+
+    for member_id in removed_ids:
+        remove(member_id)
+
+    for member in added:
+        k = state.where.get(member["id"])
+        if k is not None:
+            old = next(m for m in state.members[k] if m["id"] == member["id"])
+            if old["category"] == member["category"]:
+                state.replace(k, member)
+                continue
+            # A category change counts as leaving and re-joining
+            remove(member["id"])
+
+        k = state.best_group_for(member)
+        if k is None:
+            k = state.new_group()
+        state.add(k, member)
+        touched.add(k)
+
+    # Refill groups that dropped below 3; dissolve them if nobody can spare a member
+    for k in sorted(touched, key=lambda k: state.sizes[k]):
+        while 0 < state.sizes[k] < MIN_GROUP_SIZE:
+            pull = state.best_pull(k)
+            if pull is not None:
+                donor, member, _ = pull
+                state.remove(donor, member)
+                state.add(k, member)
+                touched.add(donor)
+                continue
+
+            if (state.sizes > 0).sum() < 2:
+                break
+            for member in list(state.members[k]):
+                j = state.best_group_for(member, exclude=k, emptiest=False)
+                if j is None:
+                    break
+                state.remove(k, member)
+                state.add(j, member)
+                touched.add(j)
+            break
+
+    # A touched group that lost a category it needs (e.g. its only senior)
+    # takes one from a group that can spare it, if that raises the total
+    for k in list(touched):
+        if state.sizes[k] == 0:
+            continue
+        pull = state.best_pull(k) if state.sizes[k] < MAX_GROUP_SIZE else None
+        if pull is not None and pull[2] > 0:
+            donor, member, _ = pull
+            state.remove(donor, member)
+            state.add(k, member)
+            touched.add(donor)
+
+    repaired = [
+        {
+            "group_id": state.ids[k],
+            "group": state.members[k],
+            "reward": int(state.scores[k]),
+        }
+        for k in range(len(state.members))
+        if state.members[k]
+    ]
+    changed = sorted(state.ids[k] for k in touched)
+    return repaired, changed
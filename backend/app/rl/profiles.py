@@ -0,0 +1,207 @@
+"""
+backend/app/rl/profiles.py
+---------------------------
+Domain-aware grouping with bit-packed member profiles.
+
+Each member's domains (member_domains) become a row of uint64 words, one
+bit per domain, so group-level domain metrics are bitwise ops + popcount:
+
+    coverage : distinct domains the group covers      popcount(OR of rows)
+    overlap  : domains shared by at least two members popcount(dup bits)
+
+partition_with_domains starts from the category-optimal partition
+(rl/partition.py) and runs a vectorized swap search that raises
+coverage/overlap without ever lowering a group's category reward, so the
+GroupEnv constraint still holds.
+"""
+
+import time
+
+import numpy as np
+
+from .batch_env import MAX_GROUP_SIZE
+from .partition import build_assignment, groups_from_assignment
+from .roster import Roster
+from .scoring import DEFAULT_ENGINE
+
+DEFAULT_WEIGHTS = {"coverage": 1.0, "overlap": 0.5}
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words):
+        """Set bits per row of a (..., W) uint64 array."""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:  # NumPy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+    def popcount(words):
+        """Set bits per row of a (..., W) uint64 array."""
+        as_bytes = np.ascontiguousarray(words).view(np.uint8)
+        return _BYTE_COUNTS[as_bytes].sum(axis=-1)
+
+
+class DomainProfiles:
+    """Bit-packed domain memberships, one row per roster member."""
+
+    def __init__(self, bits, domain_ids):
+        self.bits = bits                  # (n, W) uint64
+        self.domain_ids = domain_ids      # bit k -> domain id
+
+    @classmethod
+    def from_pairs(cls, roster, pairs):
+        """
+        pairs: iterable of (member_id, domain_id). Members not on the
+        roster are ignored.
+        """
+        pairs = np.asarray(list(pairs), dtype=np.int64).reshape(-1, 2)
+        domain_ids = np.unique(pairs[:, 1]) if len(pairs) else np.zeros(0, dtype=np.int64)
+        words = max(1, -(-len(domain_ids) // 64))
+        bits = np.zeros((len(roster), words), dtype=np.uint64)
+        if len(pairs) == 0 or len(roster) == 0:
+            return cls(bits, domain_ids)
+
+        order = np.argsort(roster.ids, kind="stable")
+        pos = np.searchsorted(roster.ids, pairs[:, 0], sorter=order)
+        pos = np.minimum(pos, len(order) - 1)
+        rows = order[pos]
+        on_roster = roster.ids[rows] == pairs[:, 0]
+
+        bit = np.searchsorted(domain_ids, pairs[:, 1])
+        np.bitwise_or.at(
+            bits,
+            (rows[on_roster], bit[on_roster] // 64),
+            np.left_shift(np.uint64(1), (bit[on_roster] % 64).astype(np.uint64)),
+        )
+        return cls(bits, domain_ids)
+
+
+# ── Group metrics ──────────────────────────────────────────────────────────
+
+def _slot_bits(profiles, slots):
+    """(r, k) member-index slots (-1 empty) -> (r, k, W) bits, zero for empty slots."""
+    bits = profiles.bits[np.maximum(slots, 0)]
+    bits[slots < 0] = 0
+    return bits
+
+
+def domain_metrics(profiles, slots):
+    """(coverage, overlap) per row of a (r, k) slots array."""
+    bits = _slot_bits(profiles, slots)
+    seen = np.zeros(bits.shape[::2], dtype=np.uint64)
+    dup = np.zeros_like(seen)
+    for k in range(slots.shape[1]):
+        dup |= seen & bits[:, k]
+        seen |= bits[:, k]
+    return popcount(seen), popcount(dup)
+
+
+def _category_scores(roster, slots, scoring):
+    codes = np.where(slots >= 0, roster.categories[np.maximum(slots, 0)], -1)
+    return scoring.score_groups(codes)
+
+
+def _domain_scores(profiles, slots, weights):
+    coverage, overlap = domain_metrics(profiles, slots)
+    return weights["coverage"] * coverage + weights["overlap"] * overlap
+
+
+# ── Search ─────────────────────────────────────────────────────────────────
+
+def _slots_from_assignment(assignment, n_groups):
+    """(n_groups, MAX_GROUP_SIZE) member indices, -1 padded, plus each member's slot."""
+    order = np.argsort(assignment, kind="stable")
+    sizes = np.bincount(assignment, minlength=n_groups)
+    starts = np.cumsum(sizes) - sizes
+    slot_of = np.empty(len(assignment), dtype=np.int64)
+    slot_of[order] = np.arange(len(order)) - np.repeat(starts, sizes)
+
+    slots = np.full((n_groups, max(MAX_GROUP_SIZE, int(sizes.max(initial=0)))), -1, dtype=np.int64)
+    slots[assignment, slot_of] = np.arange(len(assignment))
+    return slots, slot_of
+
+
+def partition_with_domains(
+    members,
+    profiles,
+    weights=None,
+    time_budget=0.1,
+    batch_size=4096,
+    patience=5,
+    scoring=DEFAULT_ENGINE,
+    rng=None,
+    max_rounds=None,
+):
+    """
+    Partition the roster into groups of 3-5, then swap members between
+    groups to raise weighted domain coverage + overlap. Swaps that would
+    lower either group's category reward are never taken. The search
+    stops after time_budget seconds, or after max_rounds rounds when given
+    (see partition.seeded_rounds).
+
+    Returns groups in the usual {"group_id", "group", "reward"} shape with
+    "coverage" and "overlap" added per group.
+    """
+    roster = Roster.coerce(members)
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    rng = rng if rng is not None else np.random.default_rng()
+    if len(roster) == 0:
+        return []
+
+    assignment, n_groups = build_assignment(roster.categories)
+    slots, slot_of = _slots_from_assignment(assignment, n_groups)
+    n = len(roster)
+
+    deadline = time.perf_counter() + time_budget
+    idle = 0
+    rounds = 0
+    while n_groups > 1 and idle < patience and (
+        rounds < max_rounds if max_rounds is not None else time.perf_counter() < deadline
+    ):
+        rounds += 1
+        a = rng.integers(0, n, size=batch_size)
+        b = rng.integers(0, n, size=batch_size)
+        ga, gb = assignment[a], assignment[b]
+        keep = ga != gb
+        a, b, ga, gb = a[keep], b[keep], ga[keep], gb[keep]
+        if len(a) == 0:
+            idle += 1
+            continue
+
+        rows = np.arange(len(a))
+        old_a, old_b = slots[ga], slots[gb]
+        new_a, new_b = old_a.copy(), old_b.copy()
+        new_a[rows, slot_of[a]] = b
+        new_b[rows, slot_of[b]] = a
+
+        cat_ok = (
+            (_category_scores(roster, new_a, scoring) >= _category_scores(roster, old_a, scoring))
+            & (_category_scores(roster, new_b, scoring) >= _category_scores(roster, old_b, scoring))
+        )
+        gain = (
+            _domain_scores(profiles, new_a, weights) + _domain_scores(profiles, new_b, weights)
+            - _domain_scores(profiles, old_a, weights) - _domain_scores(profiles, old_b, weights)
+        )
+        candidates = np.flatnonzero(cat_ok & (gain > 0))
+
+        touched = set()
+        applied = 0
+        for k in candidates[np.argsort(-gain[candidates], kind="stable")]:
+            g1, g2 = int(ga[k]), int(gb[k])
+            if g1 in touched or g2 in touched:
+                continue
+            touched.update((g1, g2))
+            m1, m2 = a[k], b[k]
+            s1, s2 = slot_of[m1], slot_of[m2]
+            slots[g1, s1], slots[g2, s2] = m2, m1
+            assignment[m1], assignment[m2] = g2, g1
+            slot_of[m1], slot_of[m2] = s2, s1
+            applied += 1
+
+        idle = 0 if applied else idle + 1
+
+    rewards = _category_scores(roster, slots, scoring)
+    coverage, overlap = domain_metrics(profiles, slots)
+    groups = groups_from_assignment(roster, assignment, rewards)
+    for g in groups:
+        g["coverage"] = int(coverage[g["group_id"] - 1])
+        g["overlap"] = int(overlap[g["group_id"] - 1])
+    return groups
@@ -0,0 +1,120 @@
+"""
+backend/app/rl/qlearning.py
+----------------------------
+Tabular Q-learning over the GroupEnv state.
+
+The state is fully described by the (senior, intermediate, junior) counts
+of the group being built (group_size is their sum), each 0..5, so the
+whole policy is a 6 x 6 x 6 x 4 table — a few KB on disk.
+
+Train and save:
+    python -m backend.app.rl.qlearning --episodes 200000
+
+generate_group_rl loads the saved table once at import (see trainer.py).
+Set RL_POLICY_PATH to use a table somewhere other than the default.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from .batch_env import BatchGroupEnv, CATEGORIES, MAX_GROUP_SIZE, STOP_ACTION
+
+N_ACTIONS = STOP_ACTION + 1
+TABLE_SHAPE = (MAX_GROUP_SIZE + 1,) * len(CATEGORIES) + (N_ACTIONS,)
+
+DEFAULT_POLICY_PATH = os.getenv(
+    "RL_POLICY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "q_policy.npy"),
+)
+
+
+def _training_roster(per_category=MAX_GROUP_SIZE * 2):
+    """Synthetic roster with enough of every category that no pool runs dry."""
+    return [
+        {"id": i * len(CATEGORIES) + c, "name": "", "category": cat}
+        for i in range(per_category)
+        for c, cat in enumerate(CATEGORIES)
+    ]
+
+
+def train_q_table(
+    episodes=200000,
+    batch_size=512,
+    alpha=0.1,
+    gamma=0.9,
+    epsilon=0.2,
+    max_steps=10,
+    rng=None,
+):
+    """
+    Epsilon-greedy Q-learning, batch_size episodes at a time on a
+    BatchGroupEnv. Returns a float32 table of shape TABLE_SHAPE.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    q = np.zeros(TABLE_SHAPE, dtype=np.float32)
+    roster = _training_roster()
+
+    for _ in range(max(1, episodes // batch_size)):
+        env = BatchGroupEnv(roster, batch_size, rng=rng)
+        states = env.reset()
+
+        for _ in range(max_steps):
+            active = np.flatnonzero(~env.done)
+            if len(active) == 0:
+                break
+
+            s = tuple(states[active, 1:].T)
+            greedy = q[s].argmax(axis=1)
+            explore = rng.random(len(active)) < epsilon
+            actions = np.full(env.n_envs, STOP_ACTION, dtype=np.int64)
+            actions[active] = np.where(explore, rng.integers(0, N_ACTIONS, len(active)), greedy)
+
+            next_states, rewards, done = env.step(actions)
+
+            s2 = tuple(next_states[active, 1:].T)
+            future = np.where(done[active], 0.0, q[s2].max(axis=1))
+            target = rewards[active] + gamma * future
+            a = actions[active]
+
+            # Many envs share a (state, action) in the same step; average
+            # their TD errors so the step size doesn't scale with batch_size
+            idx = s + (a,)
+            td = np.zeros(TABLE_SHAPE, dtype=np.float64)
+            hits = np.zeros(TABLE_SHAPE, dtype=np.int64)
+            np.add.at(td, idx, target - q[idx])
+            np.add.at(hits, idx, 1)
+            seen = hits > 0
+            q[seen] += alpha * (td[seen] / hits[seen])
+
+            states = next_states
+
+    return q
+
+
+def save_policy(q, path=DEFAULT_POLICY_PATH):
+    np.save(path, q.astype(np.float32))
+
+
+def load_policy(path=DEFAULT_POLICY_PATH):
+    """Load a saved Q table, or None if there isn't one (or it's the wrong shape)."""
+    try:
+        q = np.load(path)
+    except (OSError, ValueError):
+        return None
+    if q.shape != TABLE_SHAPE:
+        return None
+    return q
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the grouping Q table.")
+    parser.add_argument("--episodes", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=DEFAULT_POLICY_PATH)
+    args = parser.parse_args()
+
+    table = train_q_table(episodes=args.episodes, rng=np.random.default_rng(args.seed))
+    save_policy(table, args.out)
+    print(f"Saved Q table {table.shape} to {args.out}")
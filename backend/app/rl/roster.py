@@ -0,0 +1,125 @@
+"""
+backend/app/rl/roster.py
+-------------------------
+Compact, array-backed roster for the RL layer.
+
+A Roster is two parallel NumPy columns — member ids (int64) and category
+codes (int8, index into the roster's labels; 0-2 are CATEGORIES, any
+other label a member was given gets a code after those) — so a member
+costs ~9 bytes instead of a dict. Names are only needed when groups are
+handed back to the API, so they are resolved lazily: either from a names
+list given up front or through a name_loader(ids) -> {id: name} callback
+(e.g. one DB query for just the members that ended up in the output).
+
+Everything in rl/ accepts either a Roster or the old list of
+{"id", "name", "category"} dicts (see Roster.coerce).
+"""
+
+import numpy as np
+
+CATEGORIES = ("senior", "intermediate", "junior")
+CATEGORY_CODES = {c: i for i, c in enumerate(CATEGORIES)}
+
+
+def encode_categories(values):
+    """
+    Category strings -> (int8 codes, labels). Labels start with CATEGORIES;
+    anything else is appended in order of first appearance.
+    """
+    values = list(values)
+    labels = list(CATEGORIES)
+    lookup = dict(CATEGORY_CODES)
+    codes = np.empty(len(values), dtype=np.int8)
+    for i, v in enumerate(values):
+        code = lookup.get(v)
+        if code is None:
+            code = lookup[v] = len(labels)
+            labels.append(v)
+        codes[i] = code
+    return codes, tuple(labels)
+
+
+class Roster:
+    def __init__(self, ids, categories, labels=CATEGORIES, names=None, name_loader=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.categories = np.asarray(categories, dtype=np.int8)
+        self.labels = tuple(labels)
+        self._names = names
+        self._name_loader = name_loader
+        self._loaded_names = {}
+
+    @classmethod
+    def from_members(cls, members):
+        """Build from a list of {"id", "name", "category"} dicts."""
+        codes, labels = encode_categories(m["category"] for m in members)
+        return cls(
+            np.fromiter((m["id"] for m in members), dtype=np.int64, count=len(members)),
+            codes,
+            labels,
+            names=[m.get("name") for m in members],
+        )
+
+    @classmethod
+    def coerce(cls, members):
+        return members if isinstance(members, cls) else cls.from_members(members)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getstate__(self):
+        # Only the columns travel to worker processes; names stay with the parent
+        return {"ids": self.ids, "categories": self.categories, "labels": self.labels}
+
+    def __setstate__(self, state):
+        self.__init__(state["ids"], state["categories"], state["labels"])
+
+    # ── Category access ────────────────────────────────────────────────────
+
+    def mask(self, category):
+        code = CATEGORY_CODES[category] if isinstance(category, str) else category
+        return self.categories == code
+
+    def indices(self, category):
+        return np.flatnonzero(self.mask(category))
+
+    def category_counts(self):
+        """Counts per CATEGORIES entry, as a {category: count} dict."""
+        counts = np.bincount(self.categories, minlength=len(self.labels))
+        return {c: int(counts[i]) for i, c in enumerate(CATEGORIES)}
+
+    def subset(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        names = [self._names[i] for i in indices] if self._names is not None else None
+        sub = Roster(self.ids[indices], self.categories[indices], self.labels, names, self._name_loader)
+        sub._loaded_names = self._loaded_names
+        return sub
+
+    # ── Materializing members ──────────────────────────────────────────────
+
+    def _names_for(self, indices):
+        if self._names is not None:
+            return [self._names[i] for i in indices]
+
+        ids = self.ids[indices].tolist()
+        missing = [i for i in ids if i not in self._loaded_names]
+        if missing and self._name_loader is not None:
+            self._loaded_names.update(self._name_loader(missing))
+        return [self._loaded_names.get(i) for i in ids]
+
+    def members(self, indices=None):
+        """Member dicts for the given roster indices (all of them by default)."""
+        if indices is None:
+            indices = np.arange(len(self))
+        indices = np.asarray(indices, dtype=np.int64)
+        names = self._names_for(indices.tolist())
+        labels = self.labels
+        # tolist() once instead of boxing NumPy scalars per member
+        return [
+            {"id": member_id, "name": name, "category": labels[code]}
+            for member_id, code, name in zip(
+                self.ids[indices].tolist(), self.categories[indices].tolist(), names
+            )
+        ]
+
+    def member(self, index):
+        return self.members([index])[0]
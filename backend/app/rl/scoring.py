@@ -0,0 +1,136 @@
+"""
+backend/app/rl/scoring.py
+--------------------------
+Pluggable group scoring compiled into a lookup table.
+
+Reward rules are plain data (a dict, or a JSON file with the same shape):
+
+    {
+        "min_size": 3,
+        "max_size": 5,
+        "invalid_size": -2,
+        "rules": [
+            {"type": "presence", "category": "senior", "points": 3},
+            {"type": "at_least", "category": "junior", "count": 2, "points": 1},
+            {"type": "more_than", "category": "senior", "count": 2, "points": -1}
+        ]
+    }
+
+ScoringEngine evaluates them once for every (senior, intermediate,
+junior, size) combination and keeps the results in a small NumPy table,
+so scoring any number of groups is a single fancy-index lookup. The
+defaults reproduce GroupEnv's original reward exactly.
+
+min_size / max_size may be left out. The environments and the
+partitioner build groups of MIN_GROUP_SIZE to MAX_GROUP_SIZE members
+whatever the engine says, so rule sets with other bounds are rejected
+rather than silently ignored.
+"""
+
+import json
+
+import numpy as np
+
+from .roster import CATEGORIES, CATEGORY_CODES
+
+MIN_GROUP_SIZE = 3
+MAX_GROUP_SIZE = 5
+
+DEFAULT_RULES = {
+    "min_size": MIN_GROUP_SIZE,
+    "max_size": MAX_GROUP_SIZE,
+    "invalid_size": -2,
+    "rules": [
+        {"type": "presence", "category": "senior", "points": 3},
+        {"type": "presence", "category": "intermediate", "points": 2},
+        {"type": "presence", "category": "junior", "points": 1},
+    ],
+}
+
+RULE_TYPES = ("presence", "at_least", "more_than")
+
+
+def _rule_applies(rule, count):
+    kind = rule["type"]
+    if kind == "presence":
+        return count >= 1
+    if kind == "at_least":
+        return count >= rule["count"]
+    if kind == "more_than":
+        return count > rule["count"]
+    raise ValueError(f"Unknown scoring rule type {kind!r} (expected one of {RULE_TYPES})")
+
+
+class ScoringEngine:
+    def __init__(self, rules=None):
+        self.rules = rules or DEFAULT_RULES
+        self.min_size = int(self.rules.get("min_size", MIN_GROUP_SIZE))
+        self.max_size = int(self.rules.get("max_size", MAX_GROUP_SIZE))
+        if (self.min_size, self.max_size) != (MIN_GROUP_SIZE, MAX_GROUP_SIZE):
+            raise ValueError(
+                f"Group sizes are fixed at {MIN_GROUP_SIZE}-{MAX_GROUP_SIZE}, "
+                f"got min_size={self.min_size}, max_size={self.max_size}"
+            )
+        self.invalid_size = self.rules["invalid_size"]
+        # Index max_size + 1 stands for "anything bigger than allowed"
+        self.dim = self.max_size + 2
+        self.table = self._compile()
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _compile(self):
+        d = self.dim
+        table = np.zeros((d, d, d, d), dtype=np.int64)
+        for rule in self.rules["rules"]:
+            c = CATEGORY_CODES[rule["category"]]
+            counts = np.arange(d)
+            hit = np.array([_rule_applies(rule, n) for n in counts])
+            shape = [1, 1, 1, 1]
+            shape[c] = d
+            table += (hit * rule["points"]).reshape(shape)
+
+        sizes = np.arange(d)
+        bad = (sizes < self.min_size) | (sizes > self.max_size)
+        table[..., bad] = self.invalid_size
+        return table
+
+    # ── Lookups ────────────────────────────────────────────────────────────
+
+    def score(self, counts, sizes=None):
+        """
+        Scores for an (n, 3) array of senior / intermediate / junior counts.
+        sizes defaults to the row sums (pass it when groups can hold
+        members outside the three categories). Same signature as
+        batch_env.evaluate_counts, so it plugs into partitioning directly.
+        """
+        counts = np.minimum(np.asarray(counts), self.dim - 1)
+        size = counts.sum(axis=1) if sizes is None else np.asarray(sizes)
+        size = np.clip(size, 0, self.dim - 1)
+        return self.table[counts[:, 0], counts[:, 1], counts[:, 2], size]
+
+    def score_one(self, senior, intermediate, junior, size=None):
+        if size is None:
+            size = senior + intermediate + junior
+        d = self.dim - 1
+        return int(self.table[min(senior, d), min(intermediate, d), min(junior, d), min(size, d)])
+
+    def score_groups(self, codes):
+        """
+        Score a batch of candidate groups in one go.
+
+        codes: (n, k) int array of Roster category codes per slot, -1 for
+        an empty slot. Returns an (n,) array of scores.
+        """
+        codes = np.asarray(codes)
+        counts = np.stack(
+            [(codes == c).sum(axis=1) for c in range(len(CATEGORIES))],
+            axis=1,
+        )
+        sizes = (codes >= 0).sum(axis=1)
+        return self.score(counts, sizes)
+
+
+DEFAULT_ENGINE = ScoringEngine()
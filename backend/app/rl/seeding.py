@@ -0,0 +1,40 @@
+"""
+backend/app/rl/seeding.py
+--------------------------
+Per-call random state for the RL layer.
+
+Nothing in rl/ draws from the global `random` / `np.random` state: each
+entry point takes a seed (or an explicit Generator / random.Random), so
+a grouping can be replayed exactly and concurrent requests or worker
+processes never contend on one shared RNG. A seed of None means "pick a
+fresh one"; callers resolve it first and hand it back to the client.
+"""
+
+import random
+import secrets
+
+import numpy as np
+
+SEED_BITS = 32
+MAX_SEED = 2**SEED_BITS - 1   # snapshots / jobs store seeds in a BigInteger column
+
+
+def resolve_seed(seed=None) -> int:
+    """The given seed, or a new random one if it is None."""
+    return secrets.randbits(SEED_BITS) if seed is None else int(seed)
+
+
+def numpy_rng(seed=None, *key):
+    """
+    NumPy Generator for seed. key (e.g. a domain id) derives an
+    independent stream per sub-task, so each domain's result depends only
+    on (seed, domain) and not on the order work happens to finish in.
+    """
+    if seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng([int(seed), *map(int, key)])
+
+
+def python_rng(seed=None):
+    """random.Random for the per-step environment and agent."""
+    return random.Random(seed)
@@ -1,11 +1,35 @@
 from .env import GroupEnv
-from .agent import SimpleRLAgent
+from .agent import SimpleRLAgent, BatchRLAgent, QPolicyAgent
+from .batch_env import BatchGroupEnv
+from .partition import partition_members, partition_roster, groups_from_assignment, seeded_rounds
+from .profiles import DomainProfiles, partition_with_domains
+from .qlearning import load_policy
+from .roster import Roster, encode_categories
+from .seeding import numpy_rng, python_rng
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+import logging
+import multiprocessing
+import os
+import time
 
+import numpy as np
 
-def generate_group_rl(members):
-    env = GroupEnv(members)
-    agent = SimpleRLAgent()
+# Trained Q table, loaded once per process. None -> fall back to the
+# SimpleRLAgent heuristics (train one with `python -m backend.app.rl.qlearning`).
+POLICY = load_policy()
+
+logger = logging.getLogger(__name__)
+
+
+def generate_group_rl(members, rng=None):
+    roster = Roster.coerce(members)
+    rng = rng if rng is not None else python_rng()
+    env = GroupEnv(roster, rng=rng)
+    if POLICY is not None:
+        agent = QPolicyAgent(POLICY, roster.category_counts())
+    else:
+        agent = SimpleRLAgent(rng=rng)
 
     state = env.reset()
     MAX_STEPS = 10
@@ -22,58 +46,354 @@ def generate_group_rl(members):
     return env.group, reward
 
 
-def generate_all_groups_deterministic(members):
-    seniors = [m for m in members if m["category"] == "senior"]
-    intermediates = [m for m in members if m["category"] == "intermediate"]
-    juniors = [m for m in members if m["category"] == "junior"]
+def rollout_batch(members, n_rollouts, max_steps=10, rng=None):
+    """
+    Run n_rollouts independent generate_group_rl episodes at once.
+    Returns the BatchGroupEnv (for group lookups) and each episode's
+    last reward.
+    """
+    env = BatchGroupEnv(members, n_rollouts, rng=rng)
+    agent = BatchRLAgent(rng=env.rng)
 
-    groups = []
-    group_id = 1
+    states = env.reset()
+    rewards = np.zeros(n_rollouts, dtype=np.int64)
 
-    while seniors and intermediates and juniors:
-        group = [
-            seniors.pop(0),
-            intermediates.pop(0),
-            juniors.pop(0),
-        ]
+    for _ in range(max_steps):
+        active = ~env.done
+        if not active.any():
+            break
+        step_states, step_rewards, _ = env.step(agent.select_actions(states))
+        rewards[active] = step_rewards[active]
+        states = step_states
 
-        if intermediates:
-            group.append(intermediates.pop(0))
+    return env, rewards
 
-        groups.append({
-            "group_id": group_id,
-            "group": group,
-            "reward": 6
-        })
 
-        group_id += 1
+# ── Best-of-N rollouts ────────────────────────────────────────────────────
 
-    return groups
+_POOL = None
 
+# Workers are never forked from the server itself: by the time the pool
+# starts it runs the health / job threads, and a fork can leave a child
+# holding a lock (logging, the DB pool) that no thread will release
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
 
-def generate_group_rl_from_db(db, domain_id=None):
-    from backend.app.models import Member, Domain
 
-    if domain_id:
-        
-        domain = db.query(Domain).filter(Domain.id == domain_id).first()
-        if not domain:
-            return [], 0
-        members = domain.members
+def get_process_pool():
+    """
+    Process pool shared by the grouping helpers, created on first use and
+    again after a worker died (which leaves the old pool unusable).
+    """
+    global _POOL
+    if _POOL is not None and _POOL._broken:
+        shutdown_process_pool()
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context(POOL_START_METHOD),
+        )
+    return _POOL
+
+
+def shutdown_process_pool():
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+# Rollouts a worker runs between deadline checks: the most work that can
+# land after the budget has run out
+ROLLOUT_SLICE = 32
+# How long past the budget to wait for the slices in flight
+DEADLINE_GRACE = 0.1
+
+
+def _best_rollout(members, n_rollouts, seed, deadline=None):
+    """
+    Worker: run one chunk of rollouts in slices of ROLLOUT_SLICE,
+    stopping at deadline (a time.time() value, comparable across
+    processes). Returns (reward, roster indices, rollouts run);
+    (None, None, 0) if the deadline passed before the first slice.
+    """
+    rng = np.random.default_rng(seed)
+    best_reward, best_indices, done = None, None, 0
+    while done < n_rollouts and (deadline is None or time.time() < deadline):
+        size = min(ROLLOUT_SLICE, n_rollouts - done)
+        env, rewards = rollout_batch(members, size, rng=rng)
+        best = int(rewards.argmax())
+        if best_reward is None or rewards[best] > best_reward:
+            best_reward, best_indices = int(rewards[best]), env.group_indices(best).tolist()
+        done += size
+    return best_reward, best_indices, done
+
+
+def generate_group_best_of_n(members, n_rollouts=256, time_budget=1.0, parallel=True, seed=None):
+    """
+    Run n_rollouts seeded episodes (split into chunks across the process
+    pool) and keep the highest-reward group. Workers check the deadline
+    every ROLLOUT_SLICE rollouts and stop once time_budget has passed, so
+    the pool is free again within one slice of the budget; chunks that
+    haven't reported by then are dropped. Chunks that fail are logged and
+    dropped too, unless every chunk failed: then the first error is raised.
+
+    Returns (group, reward, stats) where stats reports how many rollouts
+    were requested / actually finished and the elapsed time.
+    """
+    if n_rollouts < 1:
+        raise ValueError(f"n_rollouts must be at least 1, got {n_rollouts}")
+
+    start = time.perf_counter()
+    deadline = time.time() + time_budget
+    # Workers only get the id/category columns; names are filled in here
+    roster = Roster.coerce(members)
+    n_chunks = max(1, min(n_rollouts, (os.cpu_count() or 1) * 4))
+    sizes = [len(c) for c in np.array_split(np.arange(n_rollouts), n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    results = []
+    if parallel:
+        pool = get_process_pool()
+        futures = [pool.submit(_best_rollout, roster, size, sq, deadline) for size, sq in zip(sizes, seeds)]
+        done, not_done = wait(futures, timeout=time_budget + DEADLINE_GRACE)
+        for f in not_done:
+            f.cancel()
+        errors = [f.exception() for f in done if f.exception() is not None]
+        results = [f.result() for f in done if f.exception() is None]
+        if errors:
+            if len(errors) == n_chunks:
+                raise errors[0]
+            logger.error("%d of %d rollout chunks failed", len(errors), n_chunks, exc_info=errors[0])
     else:
-        
-        members = db.query(Member).all()
-
-    members_data = [
-        {
-            "id": m.id,
-            "name": m.name,
-            "category": m.category
-        }
-        for m in members
-    ]
+        for size, sq in zip(sizes, seeds):
+            results.append(_best_rollout(roster, size, sq, deadline))
+    results = [r for r in results if r[2]]
+
+    stats = {
+        "rollouts_requested": n_rollouts,
+        "rollouts_completed": sum(r[2] for r in results),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+    if not results:
+        # Nothing finished in time — fall back to a single episode
+        group, reward = generate_group_rl(roster, rng=python_rng(seed))
+        return group, reward, stats
+
+    reward, indices, _ = max(results, key=lambda r: r[0])
+    return roster.members(indices), reward, stats
+
+
+def generate_all_groups_deterministic(members, time_budget=0, rng=None):
+    """
+    Partition every member into groups of 3-5 (see rl/partition.py).
+    With the default time_budget=0 the local-search pass is skipped and
+    the result depends only on the roster order.
+    """
+    return partition_members(members, time_budget=time_budget, rng=rng)
+
+
+def _name_loader(db, chunk_size=5000):
+    """Roster name_loader that fetches just the requested members' names."""
+    from backend.app.models import Member
+
+    def load(ids):
+        names = {}
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            names.update(db.query(Member.id, Member.name).filter(Member.id.in_(chunk)).all())
+        return names
+
+    return load
+
+
+def _load_roster(db, domain_id=None):
+    """
+    Members of one domain (or everyone) as a Roster: only ids and
+    categories are read up front, names load lazily for the output.
+    None if the domain is missing.
+    """
+    from backend.app.models import Member, Domain, MemberDomain
+
+    query = db.query(Member.id, Member.category)
+    if domain_id:
+        if not db.query(Domain.id).filter(Domain.id == domain_id).first():
+            return None
+        query = (
+            query.join(MemberDomain, MemberDomain.member_id == Member.id)
+            .filter(MemberDomain.domain_id == domain_id)
+        )
+    rows = query.order_by(Member.id).all()
+
+    codes, labels = encode_categories(r[1] for r in rows)
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    return Roster(ids, codes, labels, name_loader=_name_loader(db))
+
 
-    if len(members_data) < 3:
+def generate_group_rl_from_db(db, domain_id=None, seed=None):
+    roster = _load_roster(db, domain_id)
+    if roster is None or len(roster) < 3:
         return [], 0
 
-    return generate_group_rl(members_data)
\ No newline at end of file
+    return generate_group_rl(roster, rng=python_rng(seed))
+
+
+def generate_group_best_of_n_from_db(db, domain_id=None, **kwargs):
+    roster = _load_roster(db, domain_id)
+    if roster is None or len(roster) < 3:
+        return [], 0, {"rollouts_requested": 0, "rollouts_completed": 0, "elapsed_ms": 0.0}
+
+    return generate_group_best_of_n(roster, **kwargs)
+
+
+def _max_rounds(time_budget, seed):
+    """Seeded runs stop on a round count, not the clock (see partition.seeded_rounds)."""
+    return None if seed is None else seeded_rounds(time_budget)
+
+
+def generate_all_groups_from_db(db, domain_id=None, time_budget=0.05, seed=None):
+    """
+    Partition one domain (or everyone). The RNG stream is keyed by
+    (seed, domain), the same one generate_groups_for_all_domains uses, and
+    a seeded search runs a fixed number of rounds, so a seed reproduces a
+    domain's groups whichever path computed them.
+    """
+    roster = _load_roster(db, domain_id)
+    if roster is None or len(roster) == 0:
+        return []
+
+    return partition_members(
+        roster, time_budget=time_budget, rng=numpy_rng(seed, domain_id or 0),
+        max_rounds=_max_rounds(time_budget, seed),
+    )
+
+
+def _load_profiles(db, roster, domain_id=None):
+    """
+    Bit-packed domain profiles for a roster loaded by _load_roster: every
+    domain each member belongs to, read in one query.
+    """
+    from backend.app.models import MemberDomain
+
+    query = db.query(MemberDomain.member_id, MemberDomain.domain_id)
+    if domain_id:
+        in_domain = (
+            db.query(MemberDomain.member_id)
+            .filter(MemberDomain.domain_id == domain_id)
+            .scalar_subquery()
+        )
+        query = query.filter(MemberDomain.member_id.in_(in_domain))
+    return DomainProfiles.from_pairs(roster, query.all())
+
+
+def generate_domain_aware_groups_from_db(db, domain_id=None, time_budget=0.1, weights=None, seed=None):
+    """
+    Groups that keep the category reward of generate_all_groups_from_db
+    while maximizing domain coverage/overlap (see rl/profiles.py).
+    """
+    roster = _load_roster(db, domain_id)
+    if roster is None or len(roster) == 0:
+        return []
+
+    profiles = _load_profiles(db, roster, domain_id)
+    return partition_with_domains(
+        roster, profiles, weights=weights, time_budget=time_budget,
+        rng=numpy_rng(seed, domain_id or 0), max_rounds=_max_rounds(time_budget, seed),
+    )
+
+
+# ── All domains at once ────────────────────────────────────────────────────
+
+def _load_all_domain_rosters(db):
+    """
+    Every domain with its members, from a single joined query.
+    Returns [(domain_id, domain_name, Roster), ...]; domains with no
+    members are included with an empty roster.
+    """
+    from backend.app.models import Member, Domain, MemberDomain
+
+    rows = (
+        db.query(Domain.id, Domain.name, Member.id, Member.name, Member.category)
+        .outerjoin(MemberDomain, MemberDomain.domain_id == Domain.id)
+        .outerjoin(Member, Member.id == MemberDomain.member_id)
+        .order_by(Domain.id, Member.id)
+        .all()
+    )
+
+    domain_names = {}
+    members = defaultdict(list)
+    for domain_id, domain_name, member_id, member_name, category in rows:
+        domain_names[domain_id] = domain_name
+        if member_id is not None:
+            members[domain_id].append({"id": member_id, "name": member_name, "category": category})
+
+    return [
+        (d, domain_names[d], Roster.from_members(members.get(d, [])))
+        for d in domain_names
+    ]
+
+
+def _partition_domain(domain_id, roster, time_budget, seed=None):
+    """
+    Worker: partition one domain's roster and time it. Returns arrays
+    (assignment, rewards) — turn them into groups with
+    groups_from_assignment on the parent's roster.
+    """
+    start = time.perf_counter()
+    rng = numpy_rng(seed, domain_id or 0)
+    assignment, rewards = partition_roster(
+        roster, time_budget=time_budget, rng=rng, max_rounds=_max_rounds(time_budget, seed),
+    )
+    return domain_id, assignment, rewards, round((time.perf_counter() - start) * 1000, 1)
+
+
+def generate_groups_for_all_domains(db, time_budget=0.05, parallel=True, on_progress=None, seed=None):
+    """
+    Partition every domain in one call: one query for all memberships,
+    then each domain's grouping runs on the process pool.
+    on_progress(done, total) is called as each domain finishes.
+
+    Returns {"domains": [{domain_id, domain_name, member_count, groups,
+    total_reward, elapsed_ms}, ...], "elapsed_ms": ...}.
+    """
+    start = time.perf_counter()
+    rosters = _load_all_domain_rosters(db)
+    load_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    results = {}
+    if parallel and len(rosters) > 1:
+        pool = get_process_pool()
+        futures = [
+            pool.submit(_partition_domain, domain_id, roster, time_budget, seed)
+            for domain_id, _, roster in rosters
+        ]
+        for f in as_completed(futures):
+            domain_id, assignment, rewards, elapsed = f.result()
+            results[domain_id] = (assignment, rewards, elapsed)
+            if on_progress:
+                on_progress(len(results), len(rosters))
+    else:
+        for domain_id, _, roster in rosters:
+            _, assignment, rewards, elapsed = _partition_domain(domain_id, roster, time_budget, seed)
+            results[domain_id] = (assignment, rewards, elapsed)
+            if on_progress:
+                on_progress(len(results), len(rosters))
+
+    domains = []
+    for domain_id, domain_name, roster in rosters:
+        assignment, rewards, elapsed = results[domain_id]
+        groups = groups_from_assignment(roster, assignment, rewards)
+        domains.append({
+            "domain_id": domain_id,
+            "domain_name": domain_name,
+            "member_count": len(roster),
+            "groups": groups,
+            "total_reward": sum(g["reward"] for g in groups),
+            "elapsed_ms": elapsed,
+        })
+
+    return {
+        "domains": domains,
+        "load_ms": load_ms,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
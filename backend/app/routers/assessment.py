@@ -1,14 +1,20 @@
-import os
+import json
 from datetime import datetime, timezone
 from typing import List, Optional
-import requests as http_requests
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func, insert, update
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
-from backend.app.database import get_db
-from backend.app.models import AssessmentSession
+from backend.app.database import DbSession, get_session, run_db, session_scope
+from backend.app.models import AssessmentSession, AssessmentTurn
+from backend.app.services.context_service import fit_turns, load_context, refresh_summary, scoring_context
+from backend.app.services.ollama_health import cached_health, probe
 
 router = APIRouter(prefix="/assess", tags=["Assessment"])
 
@@ -35,6 +41,7 @@ class StartSessionResponse(BaseModel):
     student_name: str
     domains: List[str]
     message: str      # opening message from the agent
+    prompt_tokens: Optional[int] = None
 
 
 class ChatRequest(BaseModel):
@@ -45,6 +52,7 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     agent_reply: str
     turn_count: int
+    prompt_tokens: Optional[int] = None   # size of the prompt sent for this reply
 
 
 class ScoreResponse(BaseModel):
@@ -53,6 +61,7 @@ class ScoreResponse(BaseModel):
     domains: List[str]
     scores: dict
     turn_count: int
+    prompt_tokens: Optional[int] = None   # only when this call ran the scorer
 
 
 class SessionSummary(BaseModel):
@@ -66,28 +75,24 @@ class SessionSummary(BaseModel):
 
 # ── Helpers ────────────────────────────────────────────────────────────────
 
-def _check_ollama():
-    """Verify Ollama is running and the configured model is available."""
-    base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    model    = os.getenv("OLLAMA_MODEL", "llama3.2")
-    try:
-        r = http_requests.get(f"{base_url}/api/tags", timeout=3)
-        models = [m["name"] for m in r.json().get("models", [])]
-        # Accept both "llama3.2" and "llama3.2:latest" style names
-        if not any(m.startswith(model.split(":")[0]) for m in models):
-            raise HTTPException(
-                status_code=503,
-                detail=(
-                    f"Model '{model}' not found in Ollama. "
-                    f"Run: ollama pull {model}"
-                ),
-            )
-    except HTTPException:
-        raise
-    except Exception as e:
+async def _check_ollama():
+    """
+    Verify Ollama is running and the configured model is available, from
+    the health monitor's cached state (an inline probe only when stale).
+    """
+    health = cached_health() or await run_in_threadpool(probe)
+    if not health["reachable"]:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Ollama is not running. Start it with: ollama serve  ({health['error']})",
+        )
+    if not health["model_available"]:
         raise HTTPException(
             status_code=503,
-            detail=f"Ollama is not running. Start it with: ollama serve  ({e})",
+            detail=(
+                f"Model '{health['model']}' not found in Ollama. "
+                f"Run: ollama pull {health['model']}"
+            ),
         )
 
 
@@ -98,7 +103,149 @@ def _get_session(session_id: int, db: Session) -> AssessmentSession:
     return session
 
 
+def _student_turns(db: Session, session_id: int) -> int:
+    return (
+        db.query(func.count())
+        .filter(AssessmentTurn.session_id == session_id, AssessmentTurn.role == "student")
+        .scalar()
+    )
+
+
+def _load_session(db: Session, session_id: int, with_context: bool = False) -> dict:
+    """
+    The session's fields as a plain dict, safe to use once the DB call
+    returns. The prompting context (summary + unsummarized turns) is only
+    read when asked for.
+    """
+    session = _get_session(session_id, db)
+    loaded = {
+        "id": session.id,
+        "student_name": session.student_name,
+        "domains": list(session.domains or []),
+        "status": session.status,
+        "scores": session.scores,
+        "student_turns": _student_turns(db, session_id),
+    }
+    if with_context:
+        loaded.update(load_context(db, session_id))
+    return loaded
+
+
+OPENING_MESSAGE = "Hello, I'm ready to start."
+
+
+def _validate_start(req: StartSessionRequest):
+    if not req.student_name.strip():
+        raise HTTPException(status_code=400, detail="student_name cannot be empty.")
+    if not req.domains:
+        raise HTTPException(status_code=400, detail="Select at least one domain.")
+
+
+def _validate_chat(session: dict, req: ChatRequest):
+    if session["status"] == "scored":
+        raise HTTPException(status_code=400, detail="This session has already been scored.")
+    if not req.student_message.strip():
+        raise HTTPException(status_code=400, detail="student_message cannot be empty.")
+
+
+def _exchange_rows(session_id: int, seq: int, student_message: str, reply: str, usage: dict) -> list:
+    """assessment_turns rows for one student message + agent reply starting at seq."""
+    return [
+        {"session_id": session_id, "seq": seq, "role": "student", "content": student_message},
+        {
+            "session_id": session_id,
+            "seq": seq + 1,
+            "role": "agent",
+            "content": reply,
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "latency_ms": usage.get("latency_ms"),
+        },
+    ]
+
+
+def _create_session(db: Session, req: StartSessionRequest, opening: str, usage: dict) -> int:
+    session = AssessmentSession(
+        student_name=req.student_name.strip(),
+        domains=req.domains,
+        turn_count=2,
+        status="active",
+    )
+    db.add(session)
+    db.flush()
+    db.execute(insert(AssessmentTurn), _exchange_rows(session.id, 0, OPENING_MESSAGE, opening, usage))
+    db.commit()
+    return session.id
+
+
+def _append_exchange(db: Session, session_id: int, student_message: str, reply: str, usage: dict) -> int:
+    """
+    Append one student message + agent reply; returns the student turn
+    count. Two row inserts whatever the transcript length: the seqs are
+    reserved by bumping turn_count in one statement, so concurrent
+    appends to a session never collide.
+    """
+    turn_count = db.execute(
+        update(AssessmentSession)
+        .where(AssessmentSession.id == session_id)
+        .values(turn_count=AssessmentSession.turn_count + 2)
+        .returning(AssessmentSession.turn_count)
+    ).scalar()
+    if turn_count is None:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found.")
+    db.execute(insert(AssessmentTurn), _exchange_rows(session_id, turn_count - 2, student_message, reply, usage))
+    db.commit()
+    return _student_turns(db, session_id)
+
+
+# ── Streaming ──────────────────────────────────────────────────────────────
+#
+# The /stream variants send the reply as server-sent events while Ollama
+# generates it:
+#
+#   event: token   data: {"text": "..."}          one per generated chunk
+#   event: done    data: <same body as the blocking route>
+#   event: error   data: {"detail": "..."}
+#
+# The reply is saved once it is complete, just before "done"; if the
+# client goes away mid-stream nothing is saved, as with a failed request.
+# Validation and the Ollama check run before the stream opens, so those
+# still come back as ordinary HTTP errors.
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_reply(tokens, save, background=None):
+    """
+    SSE response relaying tokens, then awaiting save(reply) for the done
+    event; background runs once the response is finished.
+    """
+    async def events():
+        parts = []
+        try:
+            async for text in tokens:
+                parts.append(text)
+                yield _sse("token", {"text": text})
+            done = await save("".join(parts))
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+        yield _sse("done", done)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS, background=background,
+    )
+
+
 # ── Routes ─────────────────────────────────────────────────────────────────
+#
+# Handlers are async: DB work goes through database.run_db (a thread or
+# the async engine, per DB_ASYNC) and the Ollama calls are awaited, so a
+# slow model reply no longer pins a threadpool worker.
 
 @router.get(
     "/domains",
@@ -116,83 +263,130 @@ def list_domains():
     summary="Start a new assessment session",
     description="Create a new session for a student. Returns the agent's opening message.",
 )
-def start_session(req: StartSessionRequest, db: Session = Depends(get_db)):
-    _check_ollama()
+async def start_session(req: StartSessionRequest, db: DbSession = Depends(get_session)):
+    await _check_ollama()
+    _validate_start(req)
 
-    if not req.student_name.strip():
-        raise HTTPException(status_code=400, detail="student_name cannot be empty.")
-    if not req.domains:
-        raise HTTPException(status_code=400, detail="Select at least one domain.")
-
-    from backend.app.services.crew_service import get_interviewer_response
+    from backend.app.services.crew_service import aget_interviewer_response
 
     # Get the opening message from the agent
-    opening = get_interviewer_response(
+    usage = {}
+    opening = await aget_interviewer_response(
         student_name=req.student_name.strip(),
         domains=req.domains,
         conversation_history=[],
-        student_message="Hello, I'm ready to start.",
+        student_message=OPENING_MESSAGE,
+        usage=usage,
     )
 
-    initial_transcript = [
-        {"role": "student", "content": "Hello, I'm ready to start."},
-        {"role": "agent",   "content": opening},
-    ]
-
-    session = AssessmentSession(
+    new_id = await run_db(db, _create_session, req, opening, usage)
+    return StartSessionResponse(
+        session_id=new_id,
         student_name=req.student_name.strip(),
         domains=req.domains,
-        transcript=initial_transcript,
-        status="active",
+        message=opening,
+        prompt_tokens=usage.get("prompt_tokens"),
     )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
 
-    return StartSessionResponse(
-        session_id=session.id,
-        student_name=session.student_name,
-        domains=session.domains,
-        message=opening,
+
+@router.post(
+    "/start/stream",
+    summary="Start a new assessment session, streaming the opening message",
+    description="Like /start, but the opening message arrives as server-sent events; the session is created when it is complete.",
+)
+async def start_session_stream(req: StartSessionRequest):
+    await _check_ollama()
+    _validate_start(req)
+
+    from backend.app.services.crew_service import astream_interviewer_response
+
+    usage = {}
+    tokens = astream_interviewer_response(
+        student_name=req.student_name.strip(),
+        domains=req.domains,
+        conversation_history=[],
+        student_message=OPENING_MESSAGE,
+        usage=usage,
     )
 
+    async def save(opening):
+        async with session_scope() as db:
+            new_id = await run_db(db, _create_session, req, opening, usage)
+        return jsonable_encoder(StartSessionResponse(
+            session_id=new_id,
+            student_name=req.student_name.strip(),
+            domains=req.domains,
+            message=opening,
+            prompt_tokens=usage.get("prompt_tokens"),
+        ))
+
+    return _stream_reply(tokens, save)
+
 
 @router.post(
     "/chat",
     response_model=ChatResponse,
     summary="Send a message and get the agent's reply",
 )
-def chat(req: ChatRequest, db: Session = Depends(get_db)):
-    _check_ollama()
-    session = _get_session(req.session_id, db)
-
-    if session.status == "scored":
-        raise HTTPException(status_code=400, detail="This session has already been scored.")
+async def chat(req: ChatRequest, background_tasks: BackgroundTasks, db: DbSession = Depends(get_session)):
+    await _check_ollama()
+    session = await run_db(db, _load_session, req.session_id, True)
+    _validate_chat(session, req)
+
+    from backend.app.services.crew_service import aget_interviewer_response
+
+    # Get agent reply: rolling summary + the latest turns, within the token budget
+    _, history = fit_turns(session["summary"], session["turns"])
+    usage = {}
+    reply = await aget_interviewer_response(
+        student_name=session["student_name"],
+        domains=session["domains"],
+        conversation_history=history,
+        student_message=req.student_message.strip(),
+        usage=usage,
+        summary=session["summary"],
+    )
 
-    if not req.student_message.strip():
-        raise HTTPException(status_code=400, detail="student_message cannot be empty.")
+    student_turns = await run_db(db, _append_exchange, req.session_id, req.student_message.strip(), reply, usage)
+    background_tasks.add_task(refresh_summary, req.session_id)
+    return ChatResponse(
+        agent_reply=reply,
+        turn_count=student_turns,
+        prompt_tokens=usage.get("prompt_tokens"),
+    )
 
-    from backend.app.services.crew_service import get_interviewer_response
 
-    # Get agent reply
-    reply = get_interviewer_response(
-        student_name=session.student_name,
-        domains=session.domains,
-        conversation_history=session.transcript,
+@router.post(
+    "/chat/stream",
+    summary="Send a message and stream the agent's reply",
+    description="Like /chat, but the reply arrives as server-sent events and is saved when it is complete.",
+)
+async def chat_stream(req: ChatRequest, db: DbSession = Depends(get_session)):
+    await _check_ollama()
+    session = await run_db(db, _load_session, req.session_id, True)
+    _validate_chat(session, req)
+
+    from backend.app.services.crew_service import astream_interviewer_response
+
+    _, history = fit_turns(session["summary"], session["turns"])
+    usage = {}
+    tokens = astream_interviewer_response(
+        student_name=session["student_name"],
+        domains=session["domains"],
+        conversation_history=history,
         student_message=req.student_message.strip(),
+        usage=usage,
+        summary=session["summary"],
     )
 
-    # Append to transcript
-    updated = list(session.transcript)
-    updated.append({"role": "student", "content": req.student_message.strip()})
-    updated.append({"role": "agent",   "content": reply})
-    session.transcript = updated
-    db.commit()
+    async def save(reply):
+        async with session_scope() as db:
+            student_turns = await run_db(db, _append_exchange, req.session_id, req.student_message.strip(), reply, usage)
+        return jsonable_encoder(ChatResponse(
+            agent_reply=reply, turn_count=student_turns, prompt_tokens=usage.get("prompt_tokens"),
+        ))
 
-    return ChatResponse(
-        agent_reply=reply,
-        turn_count=len([t for t in updated if t["role"] == "student"]),
-    )
+    return _stream_reply(tokens, save, BackgroundTask(refresh_summary, req.session_id))
 
 
 @router.post(
@@ -200,49 +394,57 @@ def chat(req: ChatRequest, db: Session = Depends(get_db)):
     response_model=ScoreResponse,
     summary="End session and generate productivity score",
     description=(
-        "Triggers the CrewAI scorer to analyze the full transcript "
-        "and return a structured productivity score with feedback."
+        "Triggers the scorer on the transcript (older turns through the "
+        "rolling summary) and returns a structured productivity score with feedback."
     ),
 )
-def score_session(session_id: int, db: Session = Depends(get_db)):
-    _check_ollama()
-    session = _get_session(session_id, db)
+async def score_session(session_id: int, db: DbSession = Depends(get_session)):
+    await _check_ollama()
+    session = await run_db(db, _load_session, session_id)
 
-    if session.status == "scored":
+    if session["status"] == "scored":
         return ScoreResponse(
-            session_id=session.id,
-            student_name=session.student_name,
-            domains=session.domains,
-            scores=session.scores,
-            turn_count=len([t for t in session.transcript if t["role"] == "student"]),
+            session_id=session["id"],
+            student_name=session["student_name"],
+            domains=session["domains"],
+            scores=session["scores"],
+            turn_count=session["student_turns"],
         )
 
-    student_turns = [t for t in session.transcript if t["role"] == "student"]
-    if len(student_turns) < 2:
+    student_turns = session["student_turns"]
+    if student_turns < 2:
         raise HTTPException(
             status_code=400,
             detail="Not enough conversation to score. Have at least 2 exchanges with the agent.",
         )
 
-    from backend.app.services.crew_service import score_session as run_scorer
+    from backend.app.services.crew_service import ascore_session
 
-    scores = run_scorer(
-        student_name=session.student_name,
-        domains=session.domains,
-        conversation_history=session.transcript,
+    summary, turns = await scoring_context(db, session_id)
+    usage = {}
+    scores = await ascore_session(
+        student_name=session["student_name"],
+        domains=session["domains"],
+        conversation_history=turns,
+        usage=usage,
+        summary=summary,
     )
 
-    session.scores = scores
-    session.status = "scored"
-    session.completed_at = datetime.now(timezone.utc)
-    db.commit()
+    def work(db):
+        row = _get_session(session_id, db)
+        row.scores = scores
+        row.status = "scored"
+        row.completed_at = datetime.now(timezone.utc)
+        db.commit()
 
+    await run_db(db, work)
     return ScoreResponse(
-        session_id=session.id,
-        student_name=session.student_name,
-        domains=session.domains,
+        session_id=session["id"],
+        student_name=session["student_name"],
+        domains=session["domains"],
         scores=scores,
-        turn_count=len(student_turns),
+        turn_count=student_turns,
+        prompt_tokens=usage.get("prompt_tokens"),
     )
 
 
@@ -251,23 +453,30 @@ def score_session(session_id: int, db: Session = Depends(get_db)):
     response_model=List[SessionSummary],
     summary="List all assessment results",
 )
-def list_results(db: Session = Depends(get_db)):
-    sessions = (
-        db.query(AssessmentSession)
-        .order_by(AssessmentSession.created_at.desc())
-        .all()
-    )
-    return [
-        SessionSummary(
-            id=s.id,
-            student_name=s.student_name,
-            domains=s.domains,
-            status=s.status,
-            total_score=s.scores.get("total") if s.scores else None,
-            created_at=s.created_at.isoformat() if s.created_at else "",
-        )
-        for s in sessions
-    ]
+async def list_results(
+    status: Optional[str] = Query(None, description='"active" or "scored"; all sessions when omitted'),
+    db: DbSession = Depends(get_session),
+):
+    def work(db):
+        # (status, created_at) and created_at are both indexed, so either
+        # way the newest-first order comes from an index scan
+        query = db.query(AssessmentSession)
+        if status:
+            query = query.filter(AssessmentSession.status == status)
+        sessions = query.order_by(AssessmentSession.created_at.desc()).all()
+        return [
+            SessionSummary(
+                id=s.id,
+                student_name=s.student_name,
+                domains=s.domains,
+                status=s.status,
+                total_score=s.scores.get("total") if s.scores else None,
+                created_at=s.created_at.isoformat() if s.created_at else "",
+            )
+            for s in sessions
+        ]
+
+    return await run_db(db, work)
 
 
 @router.get(
@@ -275,16 +484,16 @@ def list_results(db: Session = Depends(get_db)):
     response_model=ScoreResponse,
     summary="Get full result for one session",
 )
-def get_result(session_id: int, db: Session = Depends(get_db)):
-    session = _get_session(session_id, db)
-    if session.status != "scored":
+async def get_result(session_id: int, db: DbSession = Depends(get_session)):
+    session = await run_db(db, _load_session, session_id)
+    if session["status"] != "scored":
         raise HTTPException(status_code=400, detail="This session has not been scored yet.")
     return ScoreResponse(
-        session_id=session.id,
-        student_name=session.student_name,
-        domains=session.domains,
-        scores=session.scores,
-        turn_count=len([t for t in session.transcript if t["role"] == "student"]),
+        session_id=session["id"],
+        student_name=session["student_name"],
+        domains=session["domains"],
+        scores=session["scores"],
+        turn_count=session["student_turns"],
     )
 
 
@@ -292,8 +501,13 @@ def get_result(session_id: int, db: Session = Depends(get_db)):
     "/sessions/{session_id}",
     summary="Delete an assessment session",
 )
-def delete_session(session_id: int, db: Session = Depends(get_db)):
-    session = _get_session(session_id, db)
-    db.delete(session)
-    db.commit()
-    return {"message": f"Session {session_id} deleted."}
+async def delete_session(session_id: int, db: DbSession = Depends(get_session)):
+    def work(db):
+        session = _get_session(session_id, db)
+        # Not left to ON DELETE CASCADE: SQLite only honours it with foreign_keys on
+        db.query(AssessmentTurn).filter(AssessmentTurn.session_id == session_id).delete()
+        db.delete(session)
+        db.commit()
+        return {"message": f"Session {session_id} deleted."}
+
+    return await run_db(db, work)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Response
+
+from backend.app.database import effective_settings
+from backend.app.services.ollama_health import current_health
+
+router = APIRouter(prefix="/diagnostics", tags=["Diagnostics"])
+
+
+@router.get("/database")
+def database_settings():
+    """Effective engine / pool / pragma settings (see database.py for the env vars)."""
+    return effective_settings()
+
+
+@router.get("/ollama")
+def ollama_health(response: Response):
+    """
+    Cached Ollama health from the background monitor: reachability, model
+    availability, probe latency and age. 503 while the assessment routes
+    would refuse requests.
+    """
+    health = current_health()
+    if not health["ok"]:
+        response.status_code = 503
+    return health
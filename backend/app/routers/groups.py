@@ -0,0 +1,162 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from backend.app.database import get_db
+from backend.app.models import Domain, GroupJob
+from backend.app.rl.seeding import MAX_SEED, resolve_seed
+from backend.app.rl.trainer import generate_domain_aware_groups_from_db
+from backend.app.services.group_service import ALL_MEMBERS, get_or_create_snapshot, regenerate_all_domains
+from backend.app.services.job_service import submit_job
+
+router = APIRouter(prefix="/groups", tags=["Groups"])
+
+
+# ── Schemas ────────────────────────────────────────────────────────────────
+
+class GroupJobRequest(BaseModel):
+    domain_id: Optional[int] = None   # ignored when all_domains is set
+    all_domains: bool = False
+    seed: Optional[int] = Field(None, ge=0, le=MAX_SEED)   # drawn at random when omitted
+
+
+def _check_domain(domain_id: Optional[int], db: Session) -> int:
+    if not domain_id:
+        return ALL_MEMBERS
+    if not db.query(Domain.id).filter(Domain.id == domain_id).first():
+        raise HTTPException(status_code=404, detail=f"Domain {domain_id} not found.")
+    return domain_id
+
+
+def _snapshot_response(snapshot, source: str):
+    return {
+        "snapshot_id": snapshot.id,
+        "domain_id": snapshot.domain_id or None,
+        "roster_version": snapshot.roster_version,
+        "seed": snapshot.seed,
+        "cached": source == "cached",
+        "source": source,
+        "created_at": snapshot.created_at.isoformat() if snapshot.created_at else "",
+        "total_reward": snapshot.total_reward,
+        "groups": snapshot.groups,
+    }
+
+
+SeedQuery = Query(None, ge=0, le=MAX_SEED, description="Replay the grouping computed with this seed")
+
+
+@router.get("/")
+def get_groups(
+    domain_id: Optional[int] = Query(None),
+    seed: Optional[int] = SeedQuery,
+    db: Session = Depends(get_db),
+):
+    """
+    Groups for one domain (or all members). Served from the stored
+    snapshot until the domain's membership changes, then repaired
+    incrementally where possible. Pass the seed from an earlier response
+    to get exactly that grouping back.
+    """
+    scope = _check_domain(domain_id, db)
+    snapshot, source = get_or_create_snapshot(db, scope, seed=seed)
+    return _snapshot_response(snapshot, source)
+
+
+@router.post("/regenerate")
+def regenerate_groups(
+    domain_id: Optional[int] = Query(None),
+    seed: Optional[int] = SeedQuery,
+    db: Session = Depends(get_db),
+):
+    """Recompute groups even if the roster hasn't changed."""
+    scope = _check_domain(domain_id, db)
+    snapshot, source = get_or_create_snapshot(db, scope, force=True, seed=seed)
+    return _snapshot_response(snapshot, source)
+
+
+@router.post("/regenerate-all")
+def regenerate_all(seed: Optional[int] = SeedQuery, db: Session = Depends(get_db)):
+    """
+    Regroup every domain at once (members loaded in one query, domains
+    grouped in parallel worker processes). Returns per-domain timings and
+    stores each domain's groups as its current snapshot.
+    """
+    return regenerate_all_domains(db, seed=seed)
+
+
+@router.get("/domain-aware")
+def get_domain_aware_groups(
+    domain_id: Optional[int] = Query(None),
+    coverage_weight: float = Query(1.0, ge=0),
+    overlap_weight: float = Query(0.5, ge=0),
+    time_budget_ms: int = Query(100, ge=0, le=5000),
+    seed: Optional[int] = SeedQuery,
+    db: Session = Depends(get_db),
+):
+    """
+    Groups with the same category reward as GET /groups/, rearranged so
+    each group covers more distinct domains (coverage) and members share
+    more of them (overlap). Computed on demand, not snapshotted.
+    time_budget_ms sizes the search as a round count, so the same seed
+    gives the same groups however long the rounds take here.
+    """
+    scope = _check_domain(domain_id, db)
+    seed = resolve_seed(seed)
+    groups = generate_domain_aware_groups_from_db(
+        db,
+        scope or None,
+        time_budget=time_budget_ms / 1000,
+        weights={"coverage": coverage_weight, "overlap": overlap_weight},
+        seed=seed,
+    )
+    return {
+        "domain_id": scope or None,
+        "seed": seed,
+        "total_reward": sum(g["reward"] for g in groups),
+        "total_coverage": sum(g["coverage"] for g in groups),
+        "total_overlap": sum(g["overlap"] for g in groups),
+        "groups": groups,
+    }
+
+
+# ── Background jobs ────────────────────────────────────────────────────────
+
+def _job_response(job: GroupJob):
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "domain_id": job.domain_id or None,
+        "seed": job.seed,
+        "status": job.status,
+        "progress": job.progress,
+        "message": job.message,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else "",
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "result": job.result if job.status == "done" else None,
+    }
+
+
+@router.post("/jobs", status_code=202)
+def create_job(req: GroupJobRequest, db: Session = Depends(get_db)):
+    """
+    Queue a regrouping in the background and return its job id right
+    away. Poll GET /groups/jobs/{job_id} for progress and the result
+    (snapshot ids and totals); once done, read the groups from GET /groups/.
+    """
+    if req.all_domains:
+        job = submit_job(db, "all_domains", seed=req.seed)
+    else:
+        job = submit_job(db, "domain", _check_domain(req.domain_id, db), seed=req.seed)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(GroupJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return _job_response(job)
@@ -1,136 +1,326 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional, List
-from backend.app.database import get_db
-from backend.app.models import Member, Domain
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func
+from typing import Optional
+from backend.app.database import DbSession, get_session, run_db
+from backend.app.models import Member, Domain, MemberDomain
 from backend.app.schemas import MemberBulkCreate, MemberCreateWithDomains
+from backend.app.services.group_service import bump_roster_versions
+from backend.app.services.member_service import (
+    DEFAULT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    DomainsNotFound,
+    InvalidImport,
+    MembersNotFound,
+    bulk_create_members,
+    export_members,
+    format_from_content_type,
+    import_member_stream,
+)
 router = APIRouter(prefix="/members", tags=["Members"])
 
 
+# ── Pagination ─────────────────────────────────────────────────────────────
+#
+# Listings are keyset-paginated on the primary key: pass the previous
+# page's next_cursor as ?after= to get the next one. next_cursor is None
+# on the last page.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MEMBER_FIELDS = ("id", "name", "category")
+
+
+def _parse_fields(fields: Optional[str]) -> tuple:
+    """?fields=id,name -> ("id", "name"); all member fields when omitted."""
+    if not fields:
+        return MEMBER_FIELDS
+    wanted = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in wanted if f not in MEMBER_FIELDS]
+    if unknown or not wanted:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {unknown} (choose from {list(MEMBER_FIELDS)})",
+        )
+    return wanted
+
+
+def _member_columns(fields: tuple) -> list:
+    # Member.id is always read first: it is the cursor even when not returned
+    return [Member.id] + [getattr(Member, f) for f in fields if f != "id"]
+
+
+def _member_dict(row, fields: tuple) -> dict:
+    values = dict(zip(("id",) + tuple(f for f in fields if f != "id"), row))
+    return {f: values[f] for f in fields}
+
+
+def _page(rows: list, limit: int, key=lambda r: r[0]):
+    """Split a limit + 1 row fetch into (page rows, next_cursor)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, key(rows[-1])
+    return rows, None
+
+
 @router.get("/domains")
-def get_domains(db: Session = Depends(get_db)):
-    """Return all domains with id and name."""
-    from backend.app.models import Domain
-    domains = db.query(Domain).all()
-    return [{"id": d.id, "name": d.name} for d in domains]
+async def get_domains(
+    after: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: DbSession = Depends(get_session),
+):
+    """Return domains (id and name), one page at a time."""
+    def work(db):
+        query = db.query(Domain.id, Domain.name)
+        if after is not None:
+            query = query.filter(Domain.id > after)
+        rows, next_cursor = _page(query.order_by(Domain.id).limit(limit + 1).all(), limit)
+        return {
+            "items": [{"id": d_id, "name": name} for d_id, name in rows],
+            "next_cursor": next_cursor,
+        }
+
+    return await run_db(db, work)
 
 
 @router.get("/by-domain")
-def get_members_by_domain(db: Session = Depends(get_db)):
-    """Return all domains, each with a list of their members."""
-    from backend.app.models import Domain
-    domains = db.query(Domain).all()
-    return [
-        {
-            "domain_id": d.id,
-            "domain_name": d.name,
-            "members": [
-                {"id": m.id, "name": m.name, "category": m.category}
-                for m in d.members
-            ],
-        }
-        for d in domains
-    ]
+async def get_members_by_domain(
+    after: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=200, description="domains per page"),
+    members_limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="members per domain"),
+    fields: Optional[str] = Query(None, description="comma-separated member fields"),
+    db: DbSession = Depends(get_session),
+):
+    """
+    Return a page of domains, each with its member count and first
+    members_limit members. Fetch the rest of a domain with
+    GET /members/?domain_id=...&after=<members_next_cursor>.
+    One query per page, however many domains it holds.
+    """
+    fields = _parse_fields(fields)
+
+    def work(db):
+        # The page's domains (plus one, to tell whether there is a next
+        # page), each joined to its first members_limit members
+        page = db.query(Domain.id, Domain.name)
+        if after is not None:
+            page = page.filter(Domain.id > after)
+        page = page.order_by(Domain.id).limit(limit + 1).subquery()
+        ranked = (
+            db.query(
+                MemberDomain.domain_id.label("domain_id"),
+                MemberDomain.member_id.label("member_id"),
+                func.row_number().over(
+                    partition_by=MemberDomain.domain_id, order_by=MemberDomain.member_id
+                ).label("rn"),
+                func.count().over(partition_by=MemberDomain.domain_id).label("total"),
+            )
+            .join(page, page.c.id == MemberDomain.domain_id)
+            .subquery()
+        )
+        rows = (
+            db.query(page.c.id, page.c.name, ranked.c.total, *_member_columns(fields))
+            .select_from(page)
+            .outerjoin(ranked, and_(ranked.c.domain_id == page.c.id, ranked.c.rn <= members_limit))
+            .outerjoin(Member, Member.id == ranked.c.member_id)
+            .order_by(page.c.id, Member.id)
+            .all()
+        )
+
+        result = {}
+        for d_id, d_name, total, *member in rows:
+            entry = result.get(d_id)
+            if entry is None:
+                entry = result[d_id] = {
+                    "domain_id": d_id,
+                    "domain_name": d_name,
+                    "member_count": 0,
+                    "members": [],
+                    "members_next_cursor": None,
+                }
+            if member[0] is None:
+                continue   # domain without members
+            entry["member_count"] = total
+            entry["members"].append(_member_dict(member, fields))
+            if total > members_limit:
+                entry["members_next_cursor"] = member[0]
+
+        domains, next_cursor = _page(list(result), limit, key=lambda d_id: d_id)
+        result = {d_id: result[d_id] for d_id in domains}
+
+        return {"items": list(result.values()), "next_cursor": next_cursor}
+
+    return await run_db(db, work)
 
 @router.get("/")
-def get_members(domain_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
-    if domain_id:
-        
-        domain = db.query(Domain).filter(Domain.id == domain_id).first()
-        if not domain:
-            return []
-        
-        return [
-            {
-                "id": m.id,
-                "name": m.name,
-                "category": m.category
-            }
-            for m in domain.members
-        ]
-    else:
-        
-        members = db.query(Member).all()
-        return [
-            {
-                "id": m.id,
-                "name": m.name,
-                "category": m.category
-            }
-            for m in members
-        ]
+async def get_members(
+    domain_id: Optional[int] = Query(None),
+    after: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="comma-separated member fields"),
+    db: DbSession = Depends(get_session),
+):
+    fields = _parse_fields(fields)
+    def work(db):
+        query = db.query(*_member_columns(fields))
+        if domain_id:
+            # An unknown domain simply has no member_domains rows -> no items
+            query = (
+                query.join(MemberDomain, MemberDomain.member_id == Member.id)
+                .filter(MemberDomain.domain_id == domain_id)
+            )
+        if after is not None:
+            query = query.filter(Member.id > after)
+
+        rows, next_cursor = _page(query.order_by(Member.id).limit(limit + 1).all(), limit)
+        return {
+            "items": [_member_dict(row, fields) for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    return await run_db(db, work)
 
 @router.post("/")
-def create_member(payload: MemberCreateWithDomains, db: Session = Depends(get_db)):
+async def create_member(payload: MemberCreateWithDomains, db: DbSession = Depends(get_session)):
     """
     Create a new member and optionally assign them to one or more domains.
     Pass domain_ids as a list of existing Domain IDs.
     """
-    member = Member(name=payload.name, category=payload.category)
-    db.add(member)
-    db.flush()  # get member.id before commit
-
-    # Assign to domains
-    if payload.domain_ids:
-        domains = db.query(Domain).filter(Domain.id.in_(payload.domain_ids)).all()
-        if len(domains) != len(payload.domain_ids):
-            found_ids = {d.id for d in domains}
-            missing = [i for i in payload.domain_ids if i not in found_ids]
-            raise HTTPException(status_code=404, detail=f"Domain IDs not found: {missing}")
-        member.domains.extend(domains)
-
-    db.commit()
-    db.refresh(member)
-    return {
-        "id": member.id,
-        "name": member.name,
-        "category": member.category,
-        "domains": [{"id": d.id, "name": d.name} for d in member.domains],
-    }
-
-@router.post("/bulk")
-def create_members_bulk(payload: MemberBulkCreate, db: Session = Depends(get_db)):
-    new_members = []
-    for m_data in payload.members:
-        member = Member(name=m_data.name, category=m_data.category)
+    def work(db):
+        member = Member(name=payload.name, category=payload.category)
         db.add(member)
-        new_members.append(member)
-    
-    db.commit()
-    for member in new_members:
+        db.flush()  # get member.id before commit
+
+        # Assign to domains
+        if payload.domain_ids:
+            domains = db.query(Domain).filter(Domain.id.in_(payload.domain_ids)).all()
+            if len(domains) != len(payload.domain_ids):
+                found_ids = {d.id for d in domains}
+                missing = [i for i in payload.domain_ids if i not in found_ids]
+                raise HTTPException(status_code=404, detail=f"Domain IDs not found: {missing}")
+            member.domains.extend(domains)
+
+        bump_roster_versions(db, payload.domain_ids or [], [member.id])
+        db.commit()
         db.refresh(member)
-        
-    return [
-        {
-            "id": m.id,
-            "name": m.name,
-            "category": m.category
+        return {
+            "id": member.id,
+            "name": member.name,
+            "category": member.category,
+            "domains": [{"id": d.id, "name": d.name} for d in member.domains],
         }
-        for m in new_members
-    ]
+
+    return await run_db(db, work)
+
+@router.post("/bulk")
+async def create_members_bulk(
+    payload: MemberBulkCreate,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    db: DbSession = Depends(get_session),
+):
+    """
+    Create many members at once, optionally assigning domains by id
+    (domain_ids) or name (domain_names). Rows go in with batched
+    INSERT ... RETURNING, in one transaction; an unknown domain rejects
+    the whole request. Returns the created members and per-batch timings.
+    """
+    def work(db):
+        rows = [
+            {"name": m.name, "category": m.category, "domain_ids": m.domain_ids, "domain_names": m.domain_names}
+            for m in payload.members
+        ]
+        result = bulk_create_members(db, rows, batch_size)
+        db.commit()
+        return result
+
+    try:
+        return await run_db(db, work)
+    except DomainsNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+@router.post("/import")
+async def import_members(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson; taken from Content-Type when omitted"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    db: DbSession = Depends(get_session),
+):
+    """
+    Import members from a CSV or NDJSON request body (the format
+    /members/export writes; domains are matched by name). Records with
+    an id update that member, the rest become new members, so importing
+    the same file twice doesn't duplicate anyone. The body is parsed as
+    it streams in and committed batch by batch: an invalid record or
+    unknown domain / member id stops the import, keeping the batches
+    before it (the error says how many records that was).
+    """
+    fmt = format or format_from_content_type(request.headers.get("content-type", ""))
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Send text/csv or application/x-ndjson, or pass ?format= (one of {list(IMPORT_FORMATS)}).",
+        )
+
+    try:
+        return await import_member_stream(db, request.stream(), fmt, batch_size)
+    except Exception as e:
+        await run_db(db, lambda s: s.rollback())
+        if isinstance(e, (DomainsNotFound, MembersNotFound, InvalidImport)):
+            status = 400 if isinstance(e, InvalidImport) else 404
+            detail = f"{e} ({e.imported} records imported before it)"
+            raise HTTPException(status_code=status, detail=detail) from e
+        raise
+
+
+@router.get("/export")
+def export_members_stream(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    domain_id: Optional[int] = Query(None),
+):
+    """
+    Stream every member (or one domain's) with their domain names, as CSV
+    or NDJSON. Rows are read through a server-side cursor and sent as
+    they come, so the roster is never held in memory as a whole.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"members{f'-domain-{domain_id}' if domain_id else ''}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        export_members(format, domain_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 
 @router.put("/{member_id}")
-def update_member(member_id: int, name: Optional[str] = None, category: Optional[str] = None, db: Session = Depends(get_db)):
-    member = db.query(Member).filter(Member.id == member_id).first()
-    if not member:
-        return {"error": "Member not found"}
-    if name:
-        member.name = name
-    if category:
-        member.category = category
-    db.commit()
-    db.refresh(member)
-    return {
-        "id": member.id,
-        "name": member.name,
-        "category": member.category
-    }
+async def update_member(member_id: int, name: Optional[str] = None, category: Optional[str] = None, db: DbSession = Depends(get_session)):
+    def work(db):
+        member = db.query(Member).filter(Member.id == member_id).first()
+        if not member:
+            return {"error": "Member not found"}
+        if name:
+            member.name = name
+        if category:
+            member.category = category
+        bump_roster_versions(db, [d.id for d in member.domains], [member.id])
+        db.commit()
+        db.refresh(member)
+        return {
+            "id": member.id,
+            "name": member.name,
+            "category": member.category
+        }
+
+    return await run_db(db, work)
 
 @router.delete("/{member_id}")
-def delete_member(member_id: int, db: Session = Depends(get_db)):
-    member = db.query(Member).filter(Member.id == member_id).first()
-    if not member:
-        return {"error": "Member not found"}
-    db.delete(member)
-    db.commit()
-    return {"message": "Member deleted successfully"}
+async def delete_member(member_id: int, db: DbSession = Depends(get_session)):
+    def work(db):
+        member = db.query(Member).filter(Member.id == member_id).first()
+        if not member:
+            return {"error": "Member not found"}
+        bump_roster_versions(db, [d.id for d in member.domains], [member.id])
+        db.delete(member)
+        db.commit()
+        return {"message": "Member deleted successfully"}
+
+    return await run_db(db, work)
@@ -20,5 +20,8 @@ class MemberResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class MemberImport(MemberCreateWithDomains):
+    domain_names: Optional[List[str]] = []  # domains can also be given by name
+
 class MemberBulkCreate(BaseModel):
-    members: List[MemberCreate]
+    members: List[MemberImport]
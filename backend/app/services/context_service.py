@@ -0,0 +1,160 @@
+"""
+backend/app/services/context_service.py
+----------------------------------------
+Bounded interview context.
+
+The interviewer is prompted with a rolling summary of the early
+conversation plus the turns not folded into it yet, verbatim and kept
+under CONTEXT_TOKEN_BUDGET tokens — so prompt size, and with it
+inference time on CPU-only hosts, stays flat however long the interview
+runs.
+
+refresh_summary, run after a reply has been sent, folds turns into
+AssessmentSession.context_summary once CONTEXT_FOLD_TURNS of them are
+older than the latest CONTEXT_RECENT_TURNS, or as soon as the
+unsummarized turns no longer fit the budget; summary_through is the
+first seq not folded in yet. Between folds there are at most
+PROMPT_TURNS unsummarized turns and the prompt carries all of them, so
+every turn is either in the summary or verbatim. Only if folds keep
+failing (Ollama down) are the oldest unsummarized turns left out rather
+than going over budget; the next refresh picks them up. Scoring folds
+synchronously instead, so nothing is left out.
+
+Token counts here are estimates (crew_service.estimate_tokens); the
+counts Ollama reports are stored on each agent turn.
+"""
+
+import logging
+import os
+
+import httpx
+from ollama import ResponseError
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.app.database import run_db, session_scope
+from backend.app.models import AssessmentSession, AssessmentTurn
+from backend.app.services.crew_service import asummarize_turns, estimate_tokens
+
+RECENT_TURNS        = int(os.getenv("CONTEXT_RECENT_TURNS", "6"))
+TOKEN_BUDGET        = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+SCORE_TOKEN_BUDGET  = int(os.getenv("CONTEXT_SCORE_TOKEN_BUDGET", "3000"))
+SUMMARY_WORDS       = int(os.getenv("CONTEXT_SUMMARY_WORDS", "200"))
+FOLD_TURNS          = int(os.getenv("CONTEXT_FOLD_TURNS", "4"))   # refresh once this many turns are out of the window
+
+logger = logging.getLogger(__name__)
+
+# Most unsummarized turns there can be between folds
+PROMPT_TURNS = RECENT_TURNS + FOLD_TURNS - 1
+
+
+def load_context(db: Session, session_id: int) -> dict:
+    """The session's summary and the turns not folded into it yet."""
+    summary, through = (
+        db.query(AssessmentSession.context_summary, AssessmentSession.summary_through)
+        .filter(AssessmentSession.id == session_id)
+        .one()
+    )
+    rows = (
+        db.query(AssessmentTurn.role, AssessmentTurn.content)
+        .filter(AssessmentTurn.session_id == session_id, AssessmentTurn.seq >= through)
+        .order_by(AssessmentTurn.seq)
+        .all()
+    )
+    return {
+        "summary": summary,
+        "summary_through": through,
+        "turns": [{"role": role, "content": content} for role, content in rows],
+    }
+
+
+def fit_turns(summary, turns: list, budget: int = TOKEN_BUDGET, recent: int = PROMPT_TURNS):
+    """
+    Split turns into (dropped, kept): kept is the newest run of at most
+    recent turns that fits in budget next to the summary (never empty
+    while there are turns).
+    """
+    used = estimate_tokens(summary)
+    start = len(turns)
+    while start > 0 and len(turns) - start < recent:
+        cost = estimate_tokens(turns[start - 1]["content"])
+        if used + cost > budget and start < len(turns):
+            break
+        used += cost
+        start -= 1
+    return turns[:start], turns[start:]
+
+
+def _store_summary(db: Session, session_id: int, through: int, new_through: int, summary: str) -> bool:
+    """Save a folded summary unless another fold got there first."""
+    stored = db.execute(
+        update(AssessmentSession)
+        .where(AssessmentSession.id == session_id, AssessmentSession.summary_through == through)
+        .values(context_summary=summary, summary_through=new_through)
+    ).rowcount
+    db.commit()
+    return stored == 1
+
+
+def _oldest_run(summary, turns: list, budget: int) -> int:
+    """How many of the oldest turns fit in budget next to the summary (at least 1)."""
+    used = estimate_tokens(summary)
+    end = 0
+    while end < len(turns):
+        cost = estimate_tokens(turns[end]["content"])
+        if used + cost > budget and end:
+            break
+        used += cost
+        end += 1
+    return end
+
+
+async def _fold(db, session_id: int, context: dict, turns: list, budget: int = SCORE_TOKEN_BUDGET) -> str:
+    """
+    Fold the oldest unsummarized turns into the summary, one summarizer
+    call per chunk that fits budget, storing the summary after each (until
+    a concurrent fold gets ahead; the result still covers every turn).
+    """
+    summary, through = context["summary"], context["summary_through"]
+    stored = True
+    while turns:
+        n = _oldest_run(summary, turns, budget)
+        summary = await asummarize_turns(summary, turns[:n], SUMMARY_WORDS)
+        if stored:
+            stored = await run_db(db, _store_summary, session_id, through, through + n, summary)
+        through += n
+        turns = turns[n:]
+    return summary
+
+
+async def refresh_summary(session_id: int):
+    """
+    Background step after a reply: fold the turns older than the latest
+    RECENT_TURNS into the summary once there are FOLD_TURNS of them, or
+    sooner if the next prompt could not carry them all within budget.
+    """
+    try:
+        async with session_scope() as db:
+            context = await run_db(db, load_context, session_id)
+            stale = len(context["turns"]) - RECENT_TURNS
+            dropped, _ = fit_turns(context["summary"], context["turns"])
+            if stale >= FOLD_TURNS or dropped:
+                await _fold(db, session_id, context, context["turns"][:max(stale, len(dropped))])
+    except (ConnectionError, httpx.HTTPError, ResponseError) as e:
+        # Ollama busy or gone: the turns stay unsummarized and the next
+        # refresh tries again; prompts meanwhile stay within budget.
+        logger.warning("Summary refresh for session %s deferred: %s", session_id, e)
+    except Exception:
+        logger.exception("Summary refresh for session %s failed", session_id)
+
+
+async def scoring_context(db, session_id: int):
+    """
+    (summary, turns) for scoring: as many of the latest turns verbatim as
+    fit SCORE_TOKEN_BUDGET, everything older folded into the summary first.
+    """
+    context = await run_db(db, load_context, session_id)
+    dropped, kept = fit_turns(context["summary"], context["turns"], SCORE_TOKEN_BUDGET, len(context["turns"]))
+    if dropped:
+        context["summary"] = await _fold(db, session_id, context, dropped)
+    return context["summary"], kept
@@ -9,6 +9,8 @@ Ollama must be running: `ollama serve` (it auto-runs on Windows).
 
 import os
 import json
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,29 +21,95 @@ OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 # Disable CrewAI telemetry to prevent signal handler warnings in FastAPI threads
 os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
 
-
-def _get_llm():
-    """Configure CrewAI to use Ollama via its OpenAI-compatible endpoint."""
-    from crewai import LLM
-    return LLM(
-        model=OLLAMA_MODEL,
-        base_url=f"{OLLAMA_BASE_URL}/v1",
-        api_key="ollama",  # dummy key required by OpenAI client
+INTERVIEWER_TEMPERATURE = 0.7
+SCORER_TEMPERATURE      = 0.3   # lower temp for more structured output
+SUMMARY_TEMPERATURE     = 0.2
+
+# Connection pool per client (sync and async each get one)
+OLLAMA_MAX_CONNECTIONS  = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "10"))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "60"))
+
+
+# ── LLM clients ────────────────────────────────────────────────────────────
+#
+# One ChatOllama per (model, base_url, temperature), built on first use and
+# shared by every request thread and task. Each holds an httpx connection
+# pool to Ollama, so replies reuse keep-alive connections instead of
+# setting up a new client per call. The async pool belongs to the event
+# loop that first uses it (the server's); close_llm_clients() runs at
+# app shutdown.
+
+_LLM_CLIENTS = {}
+_LLM_LOCK = threading.Lock()
+
+
+def get_llm(temperature: float, model: str = None, base_url: str = None):
+    """The shared ChatOllama for these settings (model / base_url default to the env config)."""
+    key = (model or OLLAMA_MODEL, base_url or OLLAMA_BASE_URL, temperature)
+    llm = _LLM_CLIENTS.get(key)
+    if llm is None:
+        with _LLM_LOCK:
+            llm = _LLM_CLIENTS.get(key)
+            if llm is None:
+                import httpx
+                from langchain_ollama import ChatOllama
+                llm = ChatOllama(
+                    model=key[0],
+                    base_url=key[1],
+                    temperature=temperature,
+                    client_kwargs={"limits": httpx.Limits(
+                        max_connections=OLLAMA_MAX_CONNECTIONS,
+                        max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+                        keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+                    )},
+                )
+                _LLM_CLIENTS[key] = llm
+    return llm
+
+
+async def close_llm_clients():
+    """Close every pooled client's connections; the next get_llm builds afresh."""
+    with _LLM_LOCK:
+        clients = list(_LLM_CLIENTS.values())
+        _LLM_CLIENTS.clear()
+    for llm in clients:
+        sync_client = getattr(llm, "_client", None)
+        if sync_client is not None:
+            sync_client.close()
+        async_client = getattr(llm, "_async_client", None)
+        if async_client is not None:
+            await async_client.close()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting prompts."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def _record_usage(usage, message, start: float, messages: list):
+    """
+    Fill the caller's usage dict (if any) with token counts and latency.
+    prompt_tokens falls back to an estimate when Ollama doesn't report it.
+    """
+    if usage is None:
+        return
+    meta = getattr(message, "usage_metadata", None) or {}
+    usage.update(
+        prompt_tokens=meta.get("input_tokens") or sum(estimate_tokens(m.content) for m in messages),
+        completion_tokens=meta.get("output_tokens"),
+        latency_ms=round((time.perf_counter() - start) * 1000, 1),
     )
 
 
 # ── Interviewer ────────────────────────────────────────────────────────────
 
-def get_interviewer_response(
+def _interviewer_messages(
     student_name: str,
     domains: list[str],
     conversation_history: list[dict],
     student_message: str,
-) -> str:
-    """
-    Stateful chat with the interviewer agent using Ollama locally.
-    """
-    from langchain_ollama import ChatOllama
+    summary: str = None,
+) -> list:
     from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
     domains_str = ", ".join(domains) if domains else "General"
@@ -67,6 +135,12 @@ You are evaluating them on:
 
 Start by introducing yourself briefly and asking the first domain-specific question."""
 
+    if summary:
+        system_prompt += f"""
+
+Summary of the interview so far (only the latest messages follow verbatim):
+{summary}"""
+
     messages = [SystemMessage(content=system_prompt)]
     for turn in conversation_history:
         if turn["role"] == "student":
@@ -74,28 +148,77 @@ Start by introducing yourself briefly and asking the first domain-specific quest
         else:
             messages.append(AIMessage(content=turn["content"]))
     messages.append(HumanMessage(content=student_message))
+    return messages
 
-    llm = ChatOllama(
-        model=OLLAMA_MODEL,
-        base_url=OLLAMA_BASE_URL,
-        temperature=0.7,
-    )
-    response = llm.invoke(messages)
+
+def get_interviewer_response(
+    student_name: str,
+    domains: list[str],
+    conversation_history: list[dict],
+    student_message: str,
+    usage: dict = None,
+    summary: str = None,
+) -> str:
+    """
+    Stateful chat with the interviewer agent using Ollama locally.
+    conversation_history may be just the latest turns, with summary
+    covering the ones before. Pass a dict as usage to get prompt_tokens /
+    completion_tokens / latency_ms for the call.
+    """
+    start = time.perf_counter()
+    messages = _interviewer_messages(student_name, domains, conversation_history, student_message, summary)
+    response = get_llm(INTERVIEWER_TEMPERATURE).invoke(messages)
+    _record_usage(usage, response, start, messages)
     return response.content
 
 
-# ── Scorer (direct Ollama call — much faster than CrewAI crew) ─────────────
+async def aget_interviewer_response(
+    student_name: str,
+    domains: list[str],
+    conversation_history: list[dict],
+    student_message: str,
+    usage: dict = None,
+    summary: str = None,
+) -> str:
+    """Async get_interviewer_response: awaits Ollama without holding a worker thread."""
+    start = time.perf_counter()
+    messages = _interviewer_messages(student_name, domains, conversation_history, student_message, summary)
+    response = await get_llm(INTERVIEWER_TEMPERATURE).ainvoke(messages)
+    _record_usage(usage, response, start, messages)
+    return response.content
 
-def score_session(
+
+async def astream_interviewer_response(
     student_name: str,
     domains: list[str],
     conversation_history: list[dict],
-) -> dict:
+    student_message: str,
+    usage: dict = None,
+    summary: str = None,
+):
     """
-    Analyze the full conversation transcript with a single Ollama LLM call.
-    Returns a dict with dimension scores + overall feedback.
+    Async generator over the interviewer's reply, yielding text as Ollama
+    produces it; usage is filled once the reply is complete.
     """
-    from langchain_ollama import ChatOllama
+    start = time.perf_counter()
+    messages = _interviewer_messages(student_name, domains, conversation_history, student_message, summary)
+    final = None
+    async for chunk in get_llm(INTERVIEWER_TEMPERATURE).astream(messages):
+        if chunk.usage_metadata:
+            final = chunk   # Ollama reports token counts on the last chunk
+        if chunk.content:
+            yield chunk.content
+    _record_usage(usage, final, start, messages)
+
+
+# ── Scorer (direct Ollama call — much faster than CrewAI crew) ─────────────
+
+def _scoring_messages(
+    student_name: str,
+    domains: list[str],
+    conversation_history: list[dict],
+    summary: str = None,
+) -> list:
     from langchain_core.messages import SystemMessage, HumanMessage
 
     domains_str = ", ".join(domains) if domains else "General"
@@ -104,6 +227,8 @@ def score_session(
         f"{'STUDENT' if t['role'] == 'student' else 'INTERVIEWER'}: {t['content']}"
         for t in conversation_history
     )
+    if summary:
+        transcript = f"[Summary of the earlier part of the interview]\n{summary}\n\n[Latest messages]\n{transcript}"
 
     system_prompt = """You are an expert academic evaluator. Analyze interview conversations and return ONLY valid JSON with no other text."""
 
@@ -124,17 +249,85 @@ Return ONLY this JSON object (no other text, no markdown):
   "areas_to_improve": ["<area 1>", "<area 2>"]
 }}"""
 
-    llm = ChatOllama(
-        model=OLLAMA_MODEL,
-        base_url=OLLAMA_BASE_URL,
-        temperature=0.3,   # lower temp for more structured output
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt),
+    ]
+
+
+def score_session(
+    student_name: str,
+    domains: list[str],
+    conversation_history: list[dict],
+    usage: dict = None,
+    summary: str = None,
+) -> dict:
+    """
+    Analyze the conversation with a single Ollama LLM call: the given
+    turns verbatim, preceded by summary if the earlier ones were folded
+    into one. Returns a dict with dimension scores + overall feedback.
+    """
+    start = time.perf_counter()
+    messages = _scoring_messages(student_name, domains, conversation_history, summary)
+    response = get_llm(SCORER_TEMPERATURE).invoke(messages)
+    _record_usage(usage, response, start, messages)
+    return _parse_scores(response.content)
+
+
+async def ascore_session(
+    student_name: str,
+    domains: list[str],
+    conversation_history: list[dict],
+    usage: dict = None,
+    summary: str = None,
+) -> dict:
+    """Async score_session."""
+    start = time.perf_counter()
+    messages = _scoring_messages(student_name, domains, conversation_history, summary)
+    response = await get_llm(SCORER_TEMPERATURE).ainvoke(messages)
+    _record_usage(usage, response, start, messages)
+    return _parse_scores(response.content)
+
+
+# ── Summarizer (rolling context for long interviews) ──────────────────────
+
+def _summary_messages(previous_summary: str, turns: list[dict], max_words: int) -> list:
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    transcript = "\n".join(
+        f"{'STUDENT' if t['role'] == 'student' else 'INTERVIEWER'}: {t['content']}"
+        for t in turns
     )
+    system_prompt = f"""You maintain a running summary of an academic interview. Merge the new messages into the summary. Keep the topics covered, the questions asked, and how well the student answered (accuracy, creativity, clarity, depth), with concrete examples. At most {max_words} words. Reply with the summary only."""
+
+    user_prompt = f"""CURRENT SUMMARY:
+{previous_summary or "(none yet)"}
 
-    response = llm.invoke([
+NEW MESSAGES:
+{transcript}"""
+
+    return [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_prompt),
-    ])
-    raw = response.content.strip()
+    ]
+
+
+async def asummarize_turns(
+    previous_summary: str,
+    turns: list[dict],
+    max_words: int = 200,
+    usage: dict = None,
+) -> str:
+    """Fold turns into previous_summary with one Ollama call; returns the new summary."""
+    start = time.perf_counter()
+    messages = _summary_messages(previous_summary, turns, max_words)
+    response = await get_llm(SUMMARY_TEMPERATURE).ainvoke(messages)
+    _record_usage(usage, response, start, messages)
+    return response.content.strip()
+
+
+def _parse_scores(raw: str) -> dict:
+    raw = raw.strip()
 
     # Strip markdown code fences if present
     if "```json" in raw:
@@ -0,0 +1,228 @@
+"""
+backend/app/services/group_service.py
+--------------------------------------
+Roster versions and cached group snapshots.
+
+Every write that changes who is in a domain (or a member's details)
+bumps that domain's roster version, plus the ALL_MEMBERS scope, and
+records which members it touched in roster_changes. Group reads are
+served from the latest snapshot for the current version. Once the
+version moves on, the previous snapshot is repaired from the members
+changed since (rl.partition.repair_groups) — only those are read back —
+and only recomputed from scratch when the roster changed too much for a
+repair to make sense, or a bump left no record.
+
+Snapshots record the seed they were computed with, so a request for a
+specific seed is served from (roster version, seed) and recomputed with
+that seed otherwise. Repaired snapshots carry no seed: they derive from
+an earlier grouping rather than from a fresh seeded run. Only the newest
+snapshot of a domain is kept; asking for another seed recomputes it
+(seeded runs are reproducible, so that gives the same groups again).
+"""
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.app.models import GroupSnapshot, Member, MemberDomain, RosterChange, RosterVersion
+
+ALL_MEMBERS = 0   # scope key for "every member, regardless of domain"
+
+
+# ── Roster versions ────────────────────────────────────────────────────────
+
+def get_roster_version(db: Session, domain_id: int = ALL_MEMBERS) -> int:
+    version = db.query(RosterVersion.version).filter(RosterVersion.domain_id == domain_id).scalar()
+    return version or 0
+
+
+def bump_roster_versions(db: Session, domain_ids=(), member_ids=()):
+    """
+    Mark the given domains (and the whole roster) as changed by a write
+    to member_ids (added, removed or edited members).
+    Call before the commit of the write that changed them.
+    """
+    # Sorted so concurrent bumps lock the rows in the same order
+    scopes = sorted({ALL_MEMBERS, *domain_ids})
+    # One upsert increments every scope in the database (no read-modify-
+    # write), creating the missing ones; concurrent writers each get
+    # their own version back
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[db.get_bind().dialect.name]
+    stmt = insert(RosterVersion).values([{"domain_id": scope, "version": 1} for scope in scopes])
+    versions = db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[RosterVersion.domain_id],
+            set_={"version": RosterVersion.version + 1},
+        ).returning(RosterVersion.domain_id, RosterVersion.version)
+    ).all()
+
+    # Only scopes with a snapshot to repair need the change recorded
+    cached = {
+        d for (d,) in
+        db.query(GroupSnapshot.domain_id).filter(GroupSnapshot.domain_id.in_(scopes)).distinct()
+    }
+    member_ids = sorted(set(member_ids))
+    for scope, version in versions:
+        if scope in cached:
+            db.add(RosterChange(domain_id=scope, version=version, member_ids=member_ids))
+
+
+# ── Snapshots ──────────────────────────────────────────────────────────────
+
+# Repair a stale snapshot only while the diff is at most this share of the roster
+REPAIR_MAX_CHANGE = 0.5
+
+
+def _latest_snapshot(db: Session, domain_id: int, seed=None):
+    query = db.query(GroupSnapshot).filter(GroupSnapshot.domain_id == domain_id)
+    if seed is not None:
+        query = query.filter(GroupSnapshot.seed == seed)
+    return (
+        query
+        .order_by(GroupSnapshot.roster_version.desc(), GroupSnapshot.id.desc())
+        .first()
+    )
+
+
+def _changed_member_ids(db: Session, domain_id: int, since: int, version: int):
+    """Ids touched by the bumps after version since, or None if one left no record."""
+    rows = (
+        db.query(RosterChange.member_ids)
+        .filter(
+            RosterChange.domain_id == domain_id,
+            RosterChange.version > since,
+            RosterChange.version <= version,
+        )
+        .all()
+    )
+    if len(rows) != version - since:
+        return None
+    return {i for (ids,) in rows for i in ids}
+
+
+def _load_changed_members(db: Session, domain_id: int, ids, chunk_size: int = 5000) -> list:
+    """Those of ids still in the scope, as {"id", "name", "category"} dicts."""
+    ids = sorted(ids)
+    members = []
+    for start in range(0, len(ids), chunk_size):
+        query = db.query(Member.id, Member.name, Member.category).filter(
+            Member.id.in_(ids[start:start + chunk_size])
+        )
+        if domain_id:
+            query = (
+                query.join(MemberDomain, MemberDomain.member_id == Member.id)
+                .filter(MemberDomain.domain_id == domain_id)
+            )
+        members += [{"id": i, "name": name, "category": category} for i, name, category in query]
+    return members
+
+
+def _repair_snapshot(db: Session, snapshot: GroupSnapshot, domain_id: int, version: int):
+    """Repaired groups for the current roster, or None if a full recompute is better."""
+    from backend.app.rl.partition import repair_groups
+
+    changed = _changed_member_ids(db, domain_id, snapshot.roster_version, version)
+    if changed is None:
+        return None
+    roster_size = sum(len(g["group"]) for g in snapshot.groups)
+    if len(changed) > REPAIR_MAX_CHANGE * max(roster_size, 1):
+        return None
+
+    current = _load_changed_members(db, domain_id, changed)
+    removed = changed - {m["id"] for m in current}
+    groups, _ = repair_groups(snapshot.groups, added=current, removed_ids=removed)
+    return groups
+
+
+def _prune(db: Session, snapshot: GroupSnapshot):
+    """
+    Drop every other snapshot of the domain up to the new one's version
+    (older versions, and earlier or forced computations of the same one),
+    and the change records only they could use.
+    """
+    db.flush()   # give the new snapshot its id
+    domain_id, version = snapshot.domain_id, snapshot.roster_version
+    db.query(GroupSnapshot).filter(
+        GroupSnapshot.domain_id == domain_id,
+        GroupSnapshot.roster_version <= version,
+        GroupSnapshot.id != snapshot.id,
+    ).delete(synchronize_session=False)
+    db.query(RosterChange).filter(
+        RosterChange.domain_id == domain_id,
+        RosterChange.version <= version,
+    ).delete(synchronize_session=False)
+
+
+def store_snapshot(db: Session, domain_id: int, version: int, groups: list, seed=None) -> GroupSnapshot:
+    """Save a new snapshot and drop the ones it supersedes."""
+    snapshot = GroupSnapshot(
+        domain_id=domain_id,
+        roster_version=version,
+        groups=groups,
+        total_reward=sum(g["reward"] for g in groups),
+        seed=seed,
+    )
+    db.add(snapshot)
+    _prune(db, snapshot)
+    db.commit()
+    db.refresh(snapshot)
+    return snapshot
+
+
+def get_or_create_snapshot(db: Session, domain_id: int = ALL_MEMBERS, force: bool = False, seed=None):
+    """
+    Return (snapshot, source) where source is "cached", "repaired" or
+    "computed". force skips both the cache and the repair path. With a
+    seed, only a snapshot computed from that seed counts as cached and
+    nothing is repaired; without one a fresh seed is drawn if needed.
+    """
+    from backend.app.rl.seeding import resolve_seed
+    from backend.app.rl.trainer import generate_all_groups_from_db
+
+    version = get_roster_version(db, domain_id)
+    if not force:
+        snapshot = _latest_snapshot(db, domain_id, seed)
+        if snapshot is not None and snapshot.roster_version == version:
+            return snapshot, "cached"
+        if snapshot is not None and seed is None:
+            groups = _repair_snapshot(db, snapshot, domain_id, version)
+            if groups is not None:
+                return store_snapshot(db, domain_id, version, groups), "repaired"
+
+    seed = resolve_seed(seed)
+    groups = generate_all_groups_from_db(db, domain_id or None, seed=seed)
+    return store_snapshot(db, domain_id, version, groups, seed), "computed"
+
+
+def regenerate_all_domains(db: Session, parallel: bool = True, on_progress=None, seed=None) -> dict:
+    """
+    Regroup every domain in one pass (see trainer.generate_groups_for_all_domains)
+    and store each result as that domain's snapshot for the version it had
+    when its roster was read.
+    """
+    from backend.app.rl.seeding import resolve_seed
+    from backend.app.rl.trainer import generate_groups_for_all_domains
+
+    seed = resolve_seed(seed)
+    # Versions first: a write landing while the rosters are loaded and
+    # grouped leaves the snapshot behind its version, so it gets repaired
+    # on the next read instead of served as cached without that write
+    versions = dict(db.query(RosterVersion.domain_id, RosterVersion.version).all())
+    result = generate_groups_for_all_domains(db, parallel=parallel, on_progress=on_progress, seed=seed)
+    result["seed"] = seed
+
+    for d in result["domains"]:
+        version = versions.get(d["domain_id"], 0)
+        snapshot = GroupSnapshot(
+            domain_id=d["domain_id"],
+            roster_version=version,
+            groups=d["groups"],
+            total_reward=d["total_reward"],
+            seed=seed,
+        )
+        db.add(snapshot)
+        _prune(db, snapshot)
+        d["snapshot_id"] = snapshot.id
+        d["roster_version"] = version
+
+    db.commit()
+    return result
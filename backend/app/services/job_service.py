@@ -0,0 +1,237 @@
+"""
+backend/app/services/job_service.py
+------------------------------------
+Background grouping jobs.
+
+POST /groups/jobs stores a GroupJob row and hands it to a small local
+thread pool, so the request returns straight away. The worker thread
+opens its own DB session, records progress on the row as it goes and
+stores the groups as snapshots. The job's result only references them
+(snapshot ids, totals, timings); clients read the groups from
+GET /groups/. The heavy partitioning itself still runs on the trainer's
+process pool.
+
+Each job records the process that owns it (WORKER_ID). While the process
+is alive, a monitor thread refreshes heartbeat_at on its unfinished jobs
+every GROUP_JOB_HEARTBEAT_INTERVAL seconds and fails jobs whose owner
+has gone quiet for GROUP_JOB_STALE_AFTER (crashed or restarted worker),
+so several workers or replicas can share the table without failing each
+other's jobs.
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.app.database import SessionLocal
+from backend.app.models import GroupJob
+
+JOB_WORKERS            = int(os.getenv("GROUP_JOB_WORKERS", "2"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("GROUP_JOB_HEARTBEAT_INTERVAL", "15"))
+JOB_STALE_AFTER        = float(os.getenv("GROUP_JOB_STALE_AFTER", str(JOB_HEARTBEAT_INTERVAL * 4)))
+
+# This process, as recorded in GroupJob.owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+UNFINISHED = ("queued", "running")
+
+logger = logging.getLogger(__name__)
+
+_EXECUTOR = None
+_STOP = None
+_THREAD = None
+
+
+def _get_executor():
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="group-job")
+    return _EXECUTOR
+
+
+def shutdown_job_workers():
+    global _EXECUTOR
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        _EXECUTOR = None
+
+
+# ── Ownership and heartbeats ───────────────────────────────────────────────
+
+def _heartbeat(db: Session):
+    """Refresh heartbeat_at on this process's unfinished jobs."""
+    db.query(GroupJob).filter(
+        GroupJob.owner == WORKER_ID, GroupJob.status.in_(UNFINISHED)
+    ).update({GroupJob.heartbeat_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    db.commit()
+
+
+def _fail_orphaned_jobs(db: Session) -> int:
+    """
+    Fail unfinished jobs whose owner stopped heartbeating, or that have
+    no owner (rows from before heartbeats). Returns how many.
+    """
+    now = datetime.now(timezone.utc)
+    failed = db.query(GroupJob).filter(
+        GroupJob.status.in_(UNFINISHED),
+        or_(GroupJob.owner.is_(None), GroupJob.owner != WORKER_ID),
+        or_(
+            GroupJob.heartbeat_at.is_(None),
+            GroupJob.heartbeat_at < now - timedelta(seconds=JOB_STALE_AFTER),
+        ),
+    ).update(
+        {
+            GroupJob.status: "failed",
+            GroupJob.error: "Interrupted: the worker running it stopped.",
+            GroupJob.finished_at: now,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return failed
+
+
+def recover_interrupted_jobs() -> int:
+    """Fail jobs orphaned by a crashed or restarted worker (see _fail_orphaned_jobs)."""
+    db = SessionLocal()
+    try:
+        return _fail_orphaned_jobs(db)
+    finally:
+        db.close()
+
+
+def _monitor(stop: threading.Event):
+    while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+        db = SessionLocal()
+        try:
+            _heartbeat(db)
+            _fail_orphaned_jobs(db)
+        except Exception:
+            logger.exception("Group job heartbeat failed")
+            db.rollback()
+        finally:
+            db.close()
+
+
+def start_job_monitor():
+    global _STOP, _THREAD
+    if _THREAD is None:
+        _STOP = threading.Event()
+        _THREAD = threading.Thread(target=_monitor, args=(_STOP,), name="group-job-heartbeat", daemon=True)
+        _THREAD.start()
+
+
+def stop_job_monitor():
+    global _STOP, _THREAD
+    if _THREAD is not None:
+        _STOP.set()
+        _THREAD = None
+        _STOP = None
+
+
+# ── Job lifecycle ──────────────────────────────────────────────────────────
+
+def submit_job(db: Session, kind: str, domain_id: int = 0, seed=None) -> GroupJob:
+    from backend.app.rl.seeding import resolve_seed
+
+    job = GroupJob(
+        kind=kind,
+        domain_id=domain_id,
+        seed=resolve_seed(seed),
+        status="queued",
+        progress=0.0,
+        owner=WORKER_ID,
+        heartbeat_at=datetime.now(timezone.utc),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _get_executor().submit(_run_job, job.id)
+    return job
+
+
+def _set_progress(db: Session, job: GroupJob, progress: float, message: str):
+    job.progress = round(progress, 3)
+    job.message = message
+    job.heartbeat_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def _run_job(job_id: int):
+    db = SessionLocal()
+    try:
+        job = db.get(GroupJob, job_id)
+        if job is None:
+            return
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        _set_progress(db, job, 0.0, "Started")
+
+        if job.kind == "all_domains":
+            job.result = _run_all_domains(db, job)
+        else:
+            job.result = _run_domain(db, job)
+
+        job.status = "done"
+        job.progress = 1.0
+        job.message = "Finished"
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        job = db.get(GroupJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            job.error = f"{e}\n{traceback.format_exc(limit=5)}"
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    finally:
+        db.close()
+
+
+def _run_domain(db: Session, job: GroupJob) -> dict:
+    from backend.app.rl.partition import groups_from_assignment
+    from backend.app.rl.roster import Roster
+    from backend.app.rl.trainer import _load_roster, _partition_domain, get_process_pool
+    from backend.app.services.group_service import get_roster_version, store_snapshot
+
+    version = get_roster_version(db, job.domain_id)
+    roster = _load_roster(db, job.domain_id or None) or Roster([], [])
+    _set_progress(db, job, 0.2, f"Loaded {len(roster)} members")
+
+    _, assignment, rewards, elapsed = get_process_pool().submit(
+        _partition_domain, job.domain_id, roster, 0.05, job.seed
+    ).result()
+    groups = groups_from_assignment(roster, assignment, rewards)
+    _set_progress(db, job, 0.8, f"Grouped in {elapsed} ms")
+
+    snapshot = store_snapshot(db, job.domain_id, version, groups, job.seed)
+    return {
+        "snapshot_id": snapshot.id,
+        "domain_id": job.domain_id or None,
+        "roster_version": version,
+        "seed": job.seed,
+        "member_count": len(roster),
+        "total_reward": snapshot.total_reward,
+        "elapsed_ms": elapsed,
+    }
+
+
+def _run_all_domains(db: Session, job: GroupJob) -> dict:
+    from backend.app.services.group_service import regenerate_all_domains
+
+    def on_progress(done, total):
+        _set_progress(db, job, 0.9 * done / max(total, 1), f"Grouped {done}/{total} domains")
+
+    result = regenerate_all_domains(db, on_progress=on_progress, seed=job.seed)
+    for d in result["domains"]:
+        del d["groups"]   # stored in the domain's snapshot
+    return result
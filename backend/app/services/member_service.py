@@ -0,0 +1,471 @@
+"""
+backend/app/services/member_service.py
+---------------------------------------
+Bulk member import and export.
+
+Members are inserted in batches with one Core INSERT ... RETURNING per
+batch (executemany under the hood), their member_domains rows with one
+more executemany, and nothing is refreshed afterwards — the ids come
+back from RETURNING. Domain references (ids or names) are resolved with
+one query per batch for the ones not seen yet.
+
+bulk_create_members runs in the caller's transaction; the caller
+commits. Unknown domains raise DomainsNotFound, unknown member ids
+MembersNotFound and bad upload data InvalidImport; the router turns them
+into 404 / 400 responses.
+
+The same batch insert backs the streaming CSV / NDJSON import, which
+also updates the members whose id a record carries, and export_members
+streams rows back out with a server-side cursor.
+"""
+
+import codecs
+import csv
+import io
+import json
+import time
+from itertools import groupby
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.app.database import run_db
+from backend.app.models import Domain, Member, MemberDomain
+from backend.app.services.group_service import bump_roster_versions
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class DomainsNotFound(LookupError):
+    """Some referenced domain ids / names don't exist."""
+
+    def __init__(self, missing: list):
+        super().__init__(f"Domains not found: {missing}")
+        self.missing = missing
+
+
+class MembersNotFound(LookupError):
+    """Some imported records carry ids of members that don't exist."""
+
+    def __init__(self, missing: list):
+        super().__init__(f"Members not found: {missing}; leave id empty to create a new member")
+        self.missing = missing
+
+
+class InvalidImport(ValueError):
+    """An upload's format, header or a record in it is invalid."""
+
+
+class DomainResolver:
+    """Maps domain ids / names to ids, querying only for ones not seen yet."""
+
+    def __init__(self):
+        self.ids = set()
+        self.by_name = {}
+
+    def resolve(self, db: Session, ids=(), names=()):
+        """Load the given ids / names; DomainsNotFound listing any that don't exist."""
+        new_ids = set(ids) - self.ids
+        new_names = set(names) - self.by_name.keys()
+        if new_ids:
+            found = {d for (d,) in db.query(Domain.id).filter(Domain.id.in_(new_ids))}
+            self.ids |= found
+            new_ids -= found
+        if new_names:
+            for d_id, name in db.query(Domain.id, Domain.name).filter(Domain.name.in_(new_names)):
+                self.by_name[name] = d_id
+                self.ids.add(d_id)
+            new_names -= self.by_name.keys()
+
+        missing = sorted(new_ids) + sorted(new_names)
+        if missing:
+            raise DomainsNotFound(missing)
+
+    def domain_ids_for(self, row: dict) -> list:
+        ids = list(row.get("domain_ids") or [])
+        ids += [self.by_name[n] for n in row.get("domain_names") or []]
+        return list(dict.fromkeys(ids))
+
+
+def _insert_members(db: Session, values: list) -> list:
+    """New member ids, in the order of values."""
+    if db.get_bind().dialect.name == "sqlite":
+        # Asking SQLite for ordered RETURNING degrades to one row per
+        # statement. Rows of one multi-row INSERT get ascending rowids in
+        # VALUES order under the write lock, so sorting restores the order.
+        return sorted(db.execute(insert(Member).returning(Member.id), values).scalars())
+    return db.execute(
+        insert(Member).returning(Member.id, sort_by_parameter_order=True), values
+    ).scalars().all()
+
+
+def insert_member_batch(db: Session, rows: list, resolver: DomainResolver) -> dict:
+    """
+    Insert one batch of {"name", "category", "domain_ids"?, "domain_names"?}
+    dicts. Returns the created members and the batch's timing.
+    """
+    start = time.perf_counter()
+    resolver.resolve(
+        db,
+        ids={d for r in rows for d in r.get("domain_ids") or []},
+        names={n for r in rows for n in r.get("domain_names") or []},
+    )
+
+    member_ids = _insert_members(db, [{"name": r["name"], "category": r["category"]} for r in rows])
+
+    links = [
+        {"member_id": m_id, "domain_id": d_id}
+        for m_id, row in zip(member_ids, rows)
+        for d_id in resolver.domain_ids_for(row)
+    ]
+    if links:
+        db.execute(insert(MemberDomain), links)
+
+    return {
+        "members": [
+            {"id": m_id, "name": r["name"], "category": r["category"]}
+            for m_id, r in zip(member_ids, rows)
+        ],
+        "domain_ids": {link["domain_id"] for link in links},
+        "timing": {
+            "rows": len(rows),
+            "memberships": len(links),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        },
+    }
+
+
+def bulk_create_members(db: Session, rows: list, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Insert every row in batches of batch_size and bump the roster
+    versions of all domains touched. Does not commit.
+    """
+    start = time.perf_counter()
+    resolver = DomainResolver()
+    members, batches, touched = [], [], set()
+
+    for offset in range(0, len(rows), batch_size):
+        result = insert_member_batch(db, rows[offset:offset + batch_size], resolver)
+        members.extend(result["members"])
+        touched |= result["domain_ids"]
+        batches.append({"batch": len(batches) + 1, **result["timing"]})
+
+    bump_roster_versions(db, touched, [m["id"] for m in members])
+    return {
+        "created": len(members),
+        "members": members,
+        "batches": batches,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+# ── Streaming import ───────────────────────────────────────────────────────
+#
+# Uploads are parsed incrementally: text is fed in as it arrives and only
+# complete records are turned into rows, so memory stays bounded by the
+# batch size no matter how large the file is.
+#
+#   CSV    header row with name, category and optionally id, domains
+#          (";"-separated names) and domain_ids (";"-separated ids);
+#          other columns are ignored.
+#   NDJSON one object per line: {"id"?, "name", "category",
+#          "domains"?: [names], "domain_ids"?: [ids]}
+#
+# Both formats match what export_members writes. A record with an id
+# updates that member (and replaces its domains if the record has a
+# domains / domain_ids field at all); one without creates a new member,
+# so re-importing an export or a sync file doesn't duplicate the roster.
+#
+# Each batch commits on its own, so a long upload never holds SQLite's
+# write lock for more than one batch. A bad record stops the import with
+# the batches before it kept; re-sending the file is safe for records
+# that carry ids.
+
+IMPORT_FORMATS = ("csv", "ndjson")
+VALID_CATEGORIES = ("senior", "intermediate", "junior")
+
+
+def _import_error(record: int, message: str):
+    return InvalidImport(f"Record {record}: {message}")
+
+
+def _split_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [v.strip() for v in str(value).split(";") if v.strip()]
+
+
+def _import_row(record: int, raw: dict) -> dict:
+    name = (raw.get("name") or "").strip()
+    category = (raw.get("category") or "").strip()
+    if not name:
+        raise _import_error(record, "name is required")
+    if category not in VALID_CATEGORIES:
+        raise _import_error(record, f"category must be one of {list(VALID_CATEGORIES)}, got {category!r}")
+    try:
+        domain_ids = [int(d) for d in _split_list(raw.get("domain_ids"))]
+    except (TypeError, ValueError):
+        raise _import_error(record, "domain_ids must be integers")
+    member_id = raw.get("id")
+    if isinstance(member_id, str):
+        member_id = member_id.strip() or None
+    try:
+        member_id = None if member_id is None else int(member_id)
+    except (TypeError, ValueError):
+        raise _import_error(record, f"id must be an integer, got {member_id!r}")
+    return {
+        "id": member_id,
+        "name": name,
+        "category": category,
+        "domain_ids": domain_ids,
+        "domain_names": [str(n) for n in _split_list(raw.get("domains"))],
+        "sets_domains": "domains" in raw or "domain_ids" in raw,
+    }
+
+
+class ImportParser:
+    """feed() text chunks, get back the rows of every record completed so far."""
+
+    def __init__(self, fmt: str):
+        if fmt not in IMPORT_FORMATS:
+            raise InvalidImport(f"Unsupported format {fmt!r} (use one of {list(IMPORT_FORMATS)})")
+        self.fmt = fmt
+        self.buffer = ""
+        self.pending = ""    # CSV record continued over a quoted newline
+        self.header = None
+        self.records = 0
+
+    def feed(self, text: str) -> list:
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split("\n")
+        return self._parse(lines)
+
+    def close(self) -> list:
+        lines, self.buffer = [self.buffer], ""
+        rows = self._parse(lines)
+        if self.pending:
+            raise _import_error(self.records + 1, "unterminated quoted field")
+        return rows
+
+    def _parse(self, lines: list) -> list:
+        rows = []
+        for line in lines:
+            line = line.rstrip("\r")
+            if self.fmt == "ndjson":
+                if line.strip():
+                    rows.append(self._ndjson_row(line))
+                continue
+
+            record = self.pending + line
+            if record.count('"') % 2:
+                # Inside a quoted field: wait for the rest of the record
+                self.pending = record + "\n"
+                continue
+            self.pending = ""
+            if not record.strip():
+                continue
+            values = next(csv.reader([record]))
+            if self.header is None:
+                self.header = [h.strip().lower() for h in values]
+                missing = {"name", "category"} - set(self.header)
+                if missing:
+                    raise InvalidImport(f"CSV header is missing {sorted(missing)}")
+                continue
+            self.records += 1
+            rows.append(_import_row(self.records, dict(zip(self.header, values))))
+        return rows
+
+    def _ndjson_row(self, line: str) -> dict:
+        self.records += 1
+        try:
+            raw = json.loads(line)
+        except ValueError as e:
+            raise _import_error(self.records, f"invalid JSON ({e})")
+        if not isinstance(raw, dict):
+            raise _import_error(self.records, "expected a JSON object")
+        return _import_row(self.records, raw)
+
+
+def format_from_content_type(content_type: str):
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def _update_members(db: Session, rows: list, resolver: DomainResolver) -> dict:
+    """
+    Update the members named by each row's id in place (a later row for
+    the same id wins). Returns the ids, every domain they were or now are
+    in, and how many memberships were written.
+    """
+    by_id = {r["id"]: r for r in rows}
+    found = {m for (m,) in db.query(Member.id).filter(Member.id.in_(by_id))}
+    if len(found) < len(by_id):
+        raise MembersNotFound(sorted(by_id.keys() - found))
+    resolver.resolve(
+        db,
+        ids={d for r in by_id.values() for d in r["domain_ids"]},
+        names={n for r in by_id.values() for n in r["domain_names"]},
+    )
+
+    touched = {
+        d for (d,) in
+        db.query(MemberDomain.domain_id).filter(MemberDomain.member_id.in_(by_id)).distinct()
+    }
+    db.execute(update(Member), [
+        {"id": m_id, "name": r["name"], "category": r["category"]} for m_id, r in by_id.items()
+    ])
+
+    relinked = [m_id for m_id, r in by_id.items() if r["sets_domains"]]
+    links = [
+        {"member_id": m_id, "domain_id": d_id}
+        for m_id in relinked
+        for d_id in resolver.domain_ids_for(by_id[m_id])
+    ]
+    if relinked:
+        db.execute(delete(MemberDomain).where(MemberDomain.member_id.in_(relinked)))
+    if links:
+        db.execute(insert(MemberDomain), links)
+
+    return {
+        "member_ids": list(by_id),
+        "domain_ids": touched | {link["domain_id"] for link in links},
+        "memberships": len(links),
+    }
+
+
+def import_member_batch(db: Session, rows: list, resolver: DomainResolver) -> dict:
+    """
+    Write one batch of parsed import rows (updating the members whose id
+    they carry, inserting the rest), bump the roster versions it touched
+    and commit. Returns the counts and the batch's timing.
+    """
+    start = time.perf_counter()
+    new = [r for r in rows if r["id"] is None]
+    existing = [r for r in rows if r["id"] is not None]
+    member_ids, touched, memberships = [], set(), 0
+
+    if new:
+        result = insert_member_batch(db, new, resolver)
+        member_ids += [m["id"] for m in result["members"]]
+        touched |= result["domain_ids"]
+        memberships += result["timing"]["memberships"]
+    if existing:
+        result = _update_members(db, existing, resolver)
+        member_ids += result["member_ids"]
+        touched |= result["domain_ids"]
+        memberships += result["memberships"]
+
+    bump_roster_versions(db, touched, member_ids)
+    db.commit()
+    return {
+        "created": len(new),
+        "updated": len(existing),
+        "timing": {
+            "rows": len(rows),
+            "memberships": memberships,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        },
+    }
+
+
+async def import_member_stream(db: Session, chunks, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Import members from an async iterator of uploaded byte chunks
+    (e.g. request.stream()). Rows are written and committed batch by
+    batch as they are parsed (through database.run_db, off the event
+    loop). On a bad record the error raised carries imported, the number
+    of records committed before it. Returns counts and per-batch timings.
+    """
+    start = time.perf_counter()
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    resolver = DomainResolver()
+    pending, batches = [], []
+    counts = {"created": 0, "updated": 0}
+
+    async def flush(rows):
+        result = await run_db(db, import_member_batch, rows, resolver)
+        counts["created"] += result["created"]
+        counts["updated"] += result["updated"]
+        batches.append({"batch": len(batches) + 1, **result["timing"]})
+
+    try:
+        parser = ImportParser(fmt)
+        async for chunk in chunks:
+            pending.extend(parser.feed(decoder.decode(chunk)))
+            while len(pending) >= batch_size:
+                await flush(pending[:batch_size])
+                del pending[:batch_size]
+
+        pending.extend(parser.feed(decoder.decode(b"", final=True)))
+        pending.extend(parser.close())
+        for offset in range(0, len(pending), batch_size):
+            await flush(pending[offset:offset + batch_size])
+    except (DomainsNotFound, MembersNotFound, InvalidImport) as e:
+        e.imported = counts["created"] + counts["updated"]
+        raise
+
+    return {
+        **counts,
+        "batches": batches,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+# ── Streaming export ───────────────────────────────────────────────────────
+
+EXPORT_CHUNK_ROWS = 1000
+
+
+def _export_rows(db: Session, domain_id=None):
+    """(id, name, category, [domain names]) per member, read through a server-side cursor."""
+    stmt = (
+        select(Member.id, Member.name, Member.category, Domain.name)
+        .outerjoin(MemberDomain, MemberDomain.member_id == Member.id)
+        .outerjoin(Domain, Domain.id == MemberDomain.domain_id)
+        .order_by(Member.id, Domain.id)
+        .execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+    )
+    if domain_id:
+        in_domain = select(MemberDomain.member_id).where(MemberDomain.domain_id == domain_id)
+        stmt = stmt.where(Member.id.in_(in_domain))
+
+    rows = db.execute(stmt)
+    for (m_id, name, category), group in groupby(rows, key=lambda r: r[:3]):
+        yield m_id, name, category, [r[3] for r in group if r[3] is not None]
+
+
+def export_members(fmt: str, domain_id=None):
+    """
+    Generator of CSV / NDJSON text for a StreamingResponse. Opens its own
+    session so it outlives the request's, and yields every
+    EXPORT_CHUNK_ROWS members.
+    """
+    from backend.app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        if fmt == "csv":
+            writer.writerow(["id", "name", "category", "domains"])
+
+        for i, (m_id, name, category, domains) in enumerate(_export_rows(db, domain_id), 1):
+            if fmt == "csv":
+                writer.writerow([m_id, name, category, ";".join(domains)])
+            else:
+                out.write(json.dumps({"id": m_id, "name": name, "category": category, "domains": domains}) + "\n")
+            if i % EXPORT_CHUNK_ROWS == 0:
+                yield out.getvalue()
+                out.seek(0)
+                out.truncate()
+
+        if out.tell():
+            yield out.getvalue()
+    finally:
+        db.close()
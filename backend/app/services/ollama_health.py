@@ -0,0 +1,111 @@
+"""
+backend/app/services/ollama_health.py
+--------------------------------------
+Background Ollama health monitor.
+
+A daemon thread polls GET /api/tags every OLLAMA_HEALTH_INTERVAL seconds
+and caches whether the server answers, whether the configured model is
+pulled, and how long the call took. Assessment handlers read that cached
+state instead of making their own round trip before every request.
+
+A single failed poll after a good one doesn't mark Ollama down; it takes
+OLLAMA_HEALTH_FAILURES in a row, so a transient hiccup doesn't fail
+requests. Readers fall back to probing inline when the cached state is
+older than OLLAMA_HEALTH_TTL (monitor not started, or stuck).
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests as http_requests
+
+from backend.app.services.crew_service import OLLAMA_BASE_URL, OLLAMA_MODEL
+
+HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))
+HEALTH_TTL      = float(os.getenv("OLLAMA_HEALTH_TTL", str(HEALTH_INTERVAL * 3)))
+HEALTH_FAILURES = int(os.getenv("OLLAMA_HEALTH_FAILURES", "2"))
+PROBE_TIMEOUT   = 3
+
+_STATE = None          # last published health dict
+_CHECKED = 0.0         # time.monotonic() of the last probe
+_FAILURES = 0          # consecutive failed probes
+_LOCK = threading.Lock()
+_STOP = None
+_THREAD = None
+
+
+def _model_available(models: list) -> bool:
+    # Accept both "llama3.2" and "llama3.2:latest" style names
+    return any(m.startswith(OLLAMA_MODEL.split(":")[0]) for m in models)
+
+
+def probe() -> dict:
+    """Query Ollama now, publish the result and return it."""
+    global _STATE, _CHECKED, _FAILURES
+    start = time.perf_counter()
+    try:
+        r = http_requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=PROBE_TIMEOUT)
+        r.raise_for_status()
+        models = [m["name"] for m in r.json().get("models", [])]
+        result = {
+            "reachable": True,
+            "model_available": _model_available(models),
+            "models": models,
+            "error": None,
+        }
+    except Exception as e:
+        result = {"reachable": False, "model_available": False, "models": [], "error": str(e)}
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    with _LOCK:
+        _FAILURES = 0 if result["reachable"] else _FAILURES + 1
+        if not result["reachable"] and _STATE and _STATE["reachable"] and _FAILURES < HEALTH_FAILURES:
+            # Keep reporting the last good state through an isolated failure
+            result = {**_STATE, "error": result["error"]}
+        result.update({
+            "ok": result["reachable"] and result["model_available"],
+            "model": OLLAMA_MODEL,
+            "base_url": OLLAMA_BASE_URL,
+            "consecutive_failures": _FAILURES,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        })
+        _STATE = result
+        _CHECKED = time.monotonic()
+    return result
+
+
+def cached_health():
+    """The last published state, or None if there is none younger than HEALTH_TTL."""
+    with _LOCK:
+        if _STATE is None or time.monotonic() - _CHECKED > HEALTH_TTL:
+            return None
+        return {**_STATE, "age_s": round(time.monotonic() - _CHECKED, 1)}
+
+
+def current_health() -> dict:
+    """Cached state when fresh, otherwise a probe made now."""
+    return cached_health() or probe()
+
+
+def _monitor(stop: threading.Event):
+    while not stop.is_set():
+        probe()
+        stop.wait(HEALTH_INTERVAL)
+
+
+def start_health_monitor():
+    global _STOP, _THREAD
+    if _THREAD is None:
+        _STOP = threading.Event()
+        _THREAD = threading.Thread(target=_monitor, args=(_STOP,), name="ollama-health", daemon=True)
+        _THREAD.start()
+
+
+def stop_health_monitor():
+    global _STOP, _THREAD
+    if _THREAD is not None:
+        _STOP.set()
+        _THREAD = None
+        _STOP = None
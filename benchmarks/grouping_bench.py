@@ -0,0 +1,249 @@
+"""
+benchmarks/grouping_bench.py
+-----------------------------
+Scaling benchmarks for the grouping code on synthetic rosters.
+
+Run from the repo root:
+    python -m benchmarks.grouping_bench
+    python -m benchmarks.grouping_bench --sizes 100 10000 1000000 --out bench.json
+
+For every roster size and case it records throughput, latency
+percentiles, peak traced memory and group quality (mean reward, members
+left unassigned) and writes everything to one JSON file so runs can be
+diffed across changes.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.app.rl.agent import SimpleRLAgent
+from backend.app.rl.batch_env import CATEGORIES
+from backend.app.rl.env import GroupEnv
+from backend.app.rl.partition import partition_members
+from backend.app.rl.trainer import (
+    generate_all_groups_deterministic,
+    generate_group_rl,
+    rollout_batch,
+)
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+# ── Synthetic rosters ──────────────────────────────────────────────────────
+
+def make_roster(n, mix=(1, 2, 4), n_domains=10, domains_per_member=(1, 3), seed=0):
+    """
+    n members with categories drawn in the given senior/intermediate/junior
+    ratio. Each member joins between domains_per_member[0] and
+    domains_per_member[1] random domains, which sets how much the domain
+    rosters overlap. Returns (members, memberships) where memberships maps
+    domain id -> list of member indices.
+    """
+    rng = np.random.default_rng(seed)
+    p = np.asarray(mix, dtype=float) / sum(mix)
+    cats = rng.choice(len(CATEGORIES), size=n, p=p)
+    members = [
+        {"id": i + 1, "name": f"member-{i + 1}", "category": CATEGORIES[c]}
+        for i, c in enumerate(cats)
+    ]
+
+    lo, hi = domains_per_member
+    per_member = rng.integers(lo, min(hi, n_domains) + 1, size=n)
+    memberships = defaultdict(list)
+    for i, k in enumerate(per_member):
+        for d in rng.choice(n_domains, size=k, replace=False):
+            memberships[int(d) + 1].append(i)
+    return members, dict(memberships)
+
+
+# ── Measurement helpers ────────────────────────────────────────────────────
+
+def _percentiles(samples_ms):
+    arr = np.asarray(samples_ms)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p90_ms": round(float(np.percentile(arr, 90)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+    }
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2**20, 2)
+
+
+def run_case(fn, reps, time_limit, items_per_call=1):
+    """
+    Call fn() up to reps times (stopping early after time_limit seconds).
+    fn returns (rewards, unassigned) for quality accounting; unassigned
+    is None for cases that don't try to place the whole roster.
+    """
+    latencies, rewards, unassigned = [], [], []
+    start = time.perf_counter()
+    for _ in range(reps):
+        t = time.perf_counter()
+        r, u = fn()
+        latencies.append((time.perf_counter() - t) * 1000)
+        rewards.extend(r)
+        if u is not None:
+            unassigned.append(u)
+        if time.perf_counter() - start > time_limit:
+            break
+
+    total_s = sum(latencies) / 1000
+    result = {
+        "calls": len(latencies),
+        "throughput_per_s": round(len(latencies) * items_per_call / total_s, 2) if total_s else None,
+        **_percentiles(latencies),
+        "peak_mem_mb": _peak_memory(fn),
+        "mean_reward": round(float(np.mean(rewards)), 3) if rewards else None,
+        "unassigned": int(np.mean(unassigned)) if unassigned else None,
+    }
+    return result
+
+
+# ── Cases ──────────────────────────────────────────────────────────────────
+
+# Each case gets its own RNG seeded from --seed, so reruns draw the same
+# groups and only timing varies between them.
+
+def _case_env_episode(members, seed):
+    """One GroupEnv + SimpleRLAgent episode (the original per-step loop)."""
+    rng = random.Random(seed)
+
+    def fn():
+        env = GroupEnv(members, rng=rng)
+        agent = SimpleRLAgent(rng=rng)
+        state = env.reset()
+        reward = -2
+        for _ in range(10):
+            state, reward, done = env.step(agent.select_action(state))
+            if done:
+                break
+        return [reward], len(members) - len(env.group)
+    return fn
+
+
+def _case_group_rl(members, seed):
+    rng = random.Random(seed)
+
+    def fn():
+        group, reward = generate_group_rl(members, rng=rng)
+        return [reward], len(members) - len(group)
+    return fn
+
+
+def _case_rollout_batch(members, n_rollouts, seed):
+    rng = np.random.default_rng(seed)
+
+    def fn():
+        _, rewards = rollout_batch(members, n_rollouts, rng=rng)
+        return rewards.tolist(), None   # many candidate groups, not a partition
+    return fn
+
+
+def _case_all_groups(members):
+    def fn():
+        groups = generate_all_groups_deterministic(members)
+        placed = sum(len(g["group"]) for g in groups)
+        return [g["reward"] for g in groups], len(members) - placed
+    return fn
+
+
+def _case_partition_refined(members, time_budget, seed):
+    rng = np.random.default_rng(seed)
+
+    def fn():
+        groups = partition_members(members, time_budget=time_budget, rng=rng)
+        placed = sum(len(g["group"]) for g in groups)
+        return [g["reward"] for g in groups], len(members) - placed
+    return fn
+
+
+def _case_per_domain(members, memberships):
+    def fn():
+        rewards, unassigned = [], 0
+        for idx in memberships.values():
+            roster = [members[i] for i in idx]
+            groups = partition_members(roster, time_budget=0)
+            rewards.extend(g["reward"] for g in groups)
+            unassigned += len(roster) - sum(len(g["group"]) for g in groups)
+        return rewards, unassigned
+    return fn
+
+
+def run_suite(sizes, reps, time_limit, mix, n_domains, domains_per_member, n_rollouts, seed):
+    results = []
+    for n in sizes:
+        members, memberships = make_roster(n, mix, n_domains, domains_per_member, seed)
+        cases = {
+            "group_env_episode": (_case_env_episode(members, seed), 1),
+            "generate_group_rl": (_case_group_rl(members, seed), 1),
+            "rollout_batch": (_case_rollout_batch(members, n_rollouts, seed), n_rollouts),
+            "generate_all_groups_deterministic": (_case_all_groups(members), 1),
+            "partition_refined_50ms": (_case_partition_refined(members, 0.05, seed), 1),
+            "partition_per_domain": (_case_per_domain(members, memberships), 1),
+        }
+        for name, (fn, items) in cases.items():
+            row = {"case": name, "roster_size": n, **run_case(fn, reps, time_limit, items)}
+            results.append(row)
+            print(
+                f"{name:<36} n={n:<9} p50={row['p50_ms']:>10.3f} ms  "
+                f"mem={row['peak_mem_mb']:>8.2f} MB  reward={row['mean_reward']}  "
+                f"unassigned={row['unassigned']}"
+            )
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark grouping on synthetic rosters.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--reps", type=int, default=20, help="max calls per case")
+    parser.add_argument("--time-limit", type=float, default=5.0, help="seconds per case")
+    parser.add_argument("--mix", type=float, nargs=3, default=[1, 2, 4],
+                        metavar=("SENIOR", "INTERMEDIATE", "JUNIOR"))
+    parser.add_argument("--domains", type=int, default=10)
+    parser.add_argument("--domains-per-member", type=int, nargs=2, default=[1, 3], metavar=("MIN", "MAX"))
+    parser.add_argument("--rollouts", type=int, default=1024, help="episodes per rollout_batch call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    rows = run_suite(
+        args.sizes, args.reps, args.time_limit, args.mix,
+        args.domains, tuple(args.domains_per_member), args.rollouts, args.seed,
+    )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "params": vars(args),
+        "results": rows,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(rows)} results to {args.out}")
@@ -1,6 +1,7 @@
 import solara
 import requests
 import os
+import json
 import time
 
 API = os.getenv("API_URL", "http://localhost:8000")
@@ -40,6 +41,30 @@ def _parse_error(r) -> str:
         return r.text or f"HTTP {r.status_code}"
 
 
+def _sse_events(r):
+    """(event, data) pairs from a text/event-stream response, as they arrive."""
+    event, data = "message", []
+    for line in r.iter_lines(decode_unicode=True):
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
+
+def _set_agent_draft(text: str, replace: bool):
+    """Show the agent reply streamed so far as the last chat bubble."""
+    updated = list(messages.value)
+    if replace:
+        updated[-1] = {"role": "agent", "content": text}
+    else:
+        updated.append({"role": "agent", "content": text})
+    messages.set(updated)
+
+
 def toggle_domain(domain: str):
     current = list(selected_domains.value)
     if domain in current:
@@ -60,20 +85,37 @@ def start_assessment():
 
     chat_loading.set(True)
     try:
-        r = requests.post(
-            f"{API}/assess/start",
+        with requests.post(
+            f"{API}/assess/start/stream",
             json={"student_name": student_name.value.strip(), "domains": selected_domains.value},
+            stream=True,
             timeout=120,   # Ollama needs ~30-60s on first call to load model
-        )
-        if r.status_code != 200:
-            setup_error.set(f"❌ {_parse_error(r)}")
-            return
-        data = r.json()
-        session_id.set(data["session_id"])
-        messages.set([{"role": "agent", "content": data["message"]}])
-        session_start_time.set(time.time())   # record start — no thread needed
-        screen.set("chat")
+        ) as r:
+            if r.status_code != 200:
+                setup_error.set(f"❌ {_parse_error(r)}")
+                return
+            # Switch to the chat screen on the first token and let the
+            # opening message type itself out
+            opening = ""
+            for event, data in _sse_events(r):
+                if event == "token":
+                    if not opening:
+                        messages.set([])
+                        session_start_time.set(time.time())   # record start — no thread needed
+                        screen.set("chat")
+                    opening += data["text"]
+                    _set_agent_draft(opening, replace=bool(messages.value))
+                elif event == "done":
+                    session_id.set(data["session_id"])
+                    _set_agent_draft(data["message"], replace=bool(messages.value))
+                    if screen.value != "chat":
+                        session_start_time.set(time.time())
+                        screen.set("chat")
+                elif event == "error":
+                    screen.set("setup")
+                    setup_error.set(f"❌ {data['detail']}")
     except Exception as e:
+        screen.set("setup")
         setup_error.set(f"❌ {e}")
     finally:
         chat_loading.set(False)
@@ -90,26 +132,28 @@ def send_message(text: str):
     messages.set(updated)
 
     chat_loading.set(True)
+    reply = ""
     try:
-        r = requests.post(
-            f"{API}/assess/chat",
+        with requests.post(
+            f"{API}/assess/chat/stream",
             json={"session_id": session_id.value, "student_message": text.strip()},
+            stream=True,
             timeout=120,   # Ollama inference can take 20-60s
-        )
-        if r.status_code == 200:
-            reply = r.json()["agent_reply"]
-            updated2 = list(messages.value)
-            updated2.append({"role": "agent", "content": reply})
-            messages.set(updated2)
-        else:
-            detail = _parse_error(r)
-            updated2 = list(messages.value)
-            updated2.append({"role": "agent", "content": f"⚠️ Error: {detail}"})
-            messages.set(updated2)
+        ) as r:
+            if r.status_code != 200:
+                _set_agent_draft(f"⚠️ Error: {_parse_error(r)}", replace=False)
+                return
+            for event, data in _sse_events(r):
+                if event == "token":
+                    _set_agent_draft(reply + data["text"], replace=bool(reply))
+                    reply += data["text"]
+                elif event == "done":
+                    _set_agent_draft(data["agent_reply"], replace=bool(reply))
+                    reply = data["agent_reply"]
+                elif event == "error":
+                    _set_agent_draft(f"⚠️ Error: {data['detail']}", replace=bool(reply))
     except Exception as e:
-        updated2 = list(messages.value)
-        updated2.append({"role": "agent", "content": f"⚠️ Connection error: {e}"})
-        messages.set(updated2)
+        _set_agent_draft(f"⚠️ Connection error: {e}", replace=bool(reply))
     finally:
         chat_loading.set(False)
 
@@ -299,7 +343,7 @@ def ChatScreen():
         with solara.Card(style="min-height:350px; max-height:450px; overflow-y:auto;"):
             for msg in messages.value:
                 ChatBubble(msg["role"], msg["content"])
-            if chat_loading.value:
+            if chat_loading.value and (not messages.value or messages.value[-1]["role"] == "student"):
                 solara.Text("🤖 Agent is thinking…", style="color:#888; font-size:13px;")
 
         # Input row — use_state keeps text stable across timer re-renders
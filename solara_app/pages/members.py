@@ -3,6 +3,9 @@ solara_app/pages/members.py
 ----------------------------
 Members page — browse members by domain, or see all members grouped by domain.
 Also supports adding and deleting members.
+
+Listings are paged by the API (?after= / next_cursor), so the page only
+fetches what is on screen and pulls more with the "Load more" buttons.
 """
 
 import solara
@@ -11,13 +14,17 @@ import os
 from typing import List
 
 API = os.getenv("API_URL", "http://localhost:8000")
+PAGE_SIZE = 50           # members per request
+DOMAINS_PAGE_SIZE = 20   # domains per /members/by-domain request
 
 # ── Reactive state ─────────────────────────────────────────────────────────
 domains           = solara.reactive([])         # [{id, name}, ...]
 selected_domain   = solara.reactive(None)       # None = all; or {id, name}
 
 members_in_domain = solara.reactive([])         # when a domain is selected
-all_by_domain     = solara.reactive([])         # [{domain_name, members:[...]}, ...]
+members_cursor    = solara.reactive(None)       # next_cursor for members_in_domain
+all_by_domain     = solara.reactive([])         # [{domain_id, domain_name, member_count, members:[...], members_next_cursor}, ...]
+domains_cursor    = solara.reactive(None)       # next_cursor for all_by_domain
 
 # Add-member form
 name_input        = solara.reactive("")
@@ -29,35 +36,102 @@ loading           = solara.reactive(False)
 
 # ── Data fetchers ──────────────────────────────────────────────────────────
 def fetch_domains():
+    """All domains for the chips and the add form (follows every page)."""
     try:
-        r = requests.get(f"{API}/members/domains", timeout=5)
-        domains.set(r.json())
+        items, cursor = [], None
+        while True:
+            params = {"limit": 1000} if cursor is None else {"limit": 1000, "after": cursor}
+            page = requests.get(f"{API}/members/domains", params=params, timeout=5).json()
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        domains.set(items)
     except Exception as e:
         status_msg.set(f"❌ Could not load domains: {e}")
 
 
+def _get_members_page(domain_id: int, after=None):
+    params = {"domain_id": domain_id, "limit": PAGE_SIZE}
+    if after is not None:
+        params["after"] = after
+    return requests.get(f"{API}/members/", params=params, timeout=5).json()
+
+
 def fetch_for_domain(domain_id: int):
     loading.set(True)
     try:
-        r = requests.get(f"{API}/members/", params={"domain_id": domain_id}, timeout=5)
-        members_in_domain.set(r.json())
+        page = _get_members_page(domain_id)
+        members_in_domain.set(page["items"])
+        members_cursor.set(page["next_cursor"])
     except Exception as e:
         status_msg.set(f"❌ {e}")
     finally:
         loading.set(False)
 
 
+def load_more_for_domain():
+    """Append the next page of the selected domain's members."""
+    if selected_domain.value is None or members_cursor.value is None:
+        return
+    try:
+        page = _get_members_page(selected_domain.value["id"], members_cursor.value)
+        members_in_domain.set(members_in_domain.value + page["items"])
+        members_cursor.set(page["next_cursor"])
+    except Exception as e:
+        status_msg.set(f"❌ {e}")
+
+
+def _get_by_domain_page(after=None):
+    params = {"limit": DOMAINS_PAGE_SIZE, "members_limit": PAGE_SIZE}
+    if after is not None:
+        params["after"] = after
+    return requests.get(f"{API}/members/by-domain", params=params, timeout=5).json()
+
+
 def fetch_all_by_domain():
     loading.set(True)
     try:
-        r = requests.get(f"{API}/members/by-domain", timeout=5)
-        all_by_domain.set(r.json())
+        page = _get_by_domain_page()
+        all_by_domain.set(page["items"])
+        domains_cursor.set(page["next_cursor"])
     except Exception as e:
         status_msg.set(f"❌ {e}")
     finally:
         loading.set(False)
 
 
+def load_more_domains():
+    if domains_cursor.value is None:
+        return
+    try:
+        page = _get_by_domain_page(domains_cursor.value)
+        all_by_domain.set(all_by_domain.value + page["items"])
+        domains_cursor.set(page["next_cursor"])
+    except Exception as e:
+        status_msg.set(f"❌ {e}")
+
+
+def load_more_in_section(domain_id: int):
+    """Append the next page of members to one domain in the all-domains view."""
+    sections = list(all_by_domain.value)
+    for i, section in enumerate(sections):
+        if section["domain_id"] != domain_id or section["members_next_cursor"] is None:
+            continue
+        try:
+            page = _get_members_page(domain_id, section["members_next_cursor"])
+        except Exception as e:
+            status_msg.set(f"❌ {e}")
+            return
+        sections[i] = {
+            **section,
+            "members": section["members"] + page["items"],
+            "members_next_cursor": page["next_cursor"],
+        }
+        all_by_domain.set(sections)
+        return
+
+
 def refresh():
     """Re-fetch whatever view is currently active."""
     status_msg.set("")
@@ -159,8 +233,16 @@ def MemberRow(member: dict):
 
 
 @solara.component
-def DomainSection(domain_name: str, members: list):
-    total = len(members)
+def LoadMoreButton(label: str, on_click):
+    with solara.Row(justify="center", style="margin:8px 0;"):
+        solara.Button(label, on_click=on_click, outlined=True, small=True)
+
+
+@solara.component
+def DomainSection(section: dict):
+    domain_name = section["domain_name"]
+    members = section["members"]
+    total = section["member_count"]
     with solara.Card(style="margin-bottom:16px;"):
         with solara.Row(justify="space-between"):
             solara.Text(
@@ -176,6 +258,11 @@ def DomainSection(domain_name: str, members: list):
         else:
             for m in members:
                 MemberRow(m)
+            if section["members_next_cursor"] is not None:
+                LoadMoreButton(
+                    f"Show more ({total - len(members)} left)",
+                    lambda: load_more_in_section(section["domain_id"]),
+                )
 
 
 @solara.component
@@ -270,13 +357,15 @@ def Page():
         # ── Refresh button ─────────────────────────────────────────────
         with solara.Row(justify="space-between", style="margin-top:8px;"):
             if selected_domain.value:
+                more = "+" if members_cursor.value is not None else ""
                 solara.Markdown(
                     f"### Members of **{selected_domain.value['name']}**"
-                    f" ({len(members_in_domain.value)})"
+                    f" ({len(members_in_domain.value)}{more})"
                 )
             else:
-                total = sum(len(d["members"]) for d in all_by_domain.value)
-                solara.Markdown(f"### All Members ({total})")
+                total = sum(d["member_count"] for d in all_by_domain.value)
+                more = "+" if domains_cursor.value is not None else ""
+                solara.Markdown(f"### All Members ({total}{more})")
             solara.Button("🔄 Refresh", on_click=refresh, outlined=True, small=True)
 
         if loading.value:
@@ -293,6 +382,8 @@ def Page():
             else:
                 for m in members_in_domain.value:
                     MemberRow(m)
+                if members_cursor.value is not None:
+                    LoadMoreButton("Load more members", load_more_for_domain)
 
         # ── All domains view ───────────────────────────────────────────
         else:
@@ -303,7 +394,6 @@ def Page():
                 )
             else:
                 for domain_data in all_by_domain.value:
-                    DomainSection(
-                        domain_data["domain_name"],
-                        domain_data["members"],
-                    )
+                    DomainSection(domain_data)
+                if domains_cursor.value is not None:
+                    LoadMoreButton("Load more domains", load_more_domains)
@@ -0,0 +1,117 @@
+"""
+tests/test_member_queries.py
+-----------------------------
+The member listings must run a fixed number of SQL statements per page,
+however large the roster: no per-domain or per-member queries.
+
+Runs against a throwaway SQLite file; statements are counted with a
+before_cursor_execute listener on the engine.
+"""
+
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'members.db')}"
+os.environ["DB_ASYNC"] = "false"
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, insert
+
+from backend.app.database import SessionLocal, engine
+from backend.app.migrations import ensure_schema
+from backend.app.models import Domain, Member, MemberDomain
+from backend.app.routers import members
+
+DOMAINS = 5
+
+
+@pytest.fixture(scope="module")
+def client():
+    ensure_schema(engine)
+    app = FastAPI()
+    app.include_router(members.router)
+    with TestClient(app) as c:
+        yield c
+
+
+def _seed(members_per_domain: int):
+    """DOMAINS domains, each with members_per_domain members of its own."""
+    with SessionLocal() as db:
+        for table in (MemberDomain, Member, Domain):
+            db.execute(delete(table))
+        db.execute(insert(Domain), [{"id": d, "name": f"domain {d}"} for d in range(1, DOMAINS + 1)])
+        db.execute(insert(Member), [
+            {"id": m, "name": f"member {m}", "category": "student"}
+            for m in range(1, DOMAINS * members_per_domain + 1)
+        ])
+        db.execute(insert(MemberDomain), [
+            {"member_id": m, "domain_id": (m - 1) % DOMAINS + 1}
+            for m in range(1, DOMAINS * members_per_domain + 1)
+        ])
+        db.commit()
+
+
+def _count_queries(client, url: str):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert response.status_code == 200, response.text
+    return len(statements), response.json()
+
+
+@pytest.mark.parametrize("members_per_domain", [2, 50, 400])
+def test_by_domain_runs_one_query(client, members_per_domain):
+    _seed(members_per_domain)
+
+    n, body = _count_queries(client, "/members/by-domain?limit=3&members_limit=10")
+    assert n == 1
+    assert [d["domain_id"] for d in body["items"]] == [1, 2, 3]
+    assert body["next_cursor"] == 3
+    assert all(d["member_count"] == members_per_domain for d in body["items"])
+    assert all(len(d["members"]) == min(members_per_domain, 10) for d in body["items"])
+
+    n, body = _count_queries(client, "/members/by-domain?after=3&limit=3")
+    assert n == 1
+    assert [d["domain_id"] for d in body["items"]] == [4, 5]
+    assert body["next_cursor"] is None
+
+
+def test_by_domain_keeps_empty_domains(client):
+    _seed(2)
+    with SessionLocal() as db:
+        db.execute(insert(Domain), [{"id": DOMAINS + 1, "name": "empty"}])
+        db.commit()
+
+    n, body = _count_queries(client, f"/members/by-domain?after={DOMAINS}")
+    assert n == 1
+    assert body["items"] == [{
+        "domain_id": DOMAINS + 1,
+        "domain_name": "empty",
+        "member_count": 0,
+        "members": [],
+        "members_next_cursor": None,
+    }]
+
+
+@pytest.mark.parametrize("members_per_domain", [2, 50, 400])
+def test_members_runs_one_query(client, members_per_domain):
+    _seed(members_per_domain)
+
+    n, body = _count_queries(client, "/members/?limit=100")
+    assert n == 1
+    assert len(body["items"]) == min(DOMAINS * members_per_domain, 100)
+
+    n, body = _count_queries(client, "/members/?domain_id=2&limit=100&fields=id,name")
+    assert n == 1
+    assert len(body["items"]) == min(members_per_domain, 100)
+    assert set(body["items"][0]) == {"id", "name"}